@@ -32,7 +32,8 @@ async def upload_document(
             document_type=document_type,
             uploaded_by=uploaded_by,
             faculty=faculty,
-            academic_year=academic_year
+            academic_year=academic_year,
+            file_size=file.size
         )
         return document
     except Exception as e:
@@ -47,11 +47,17 @@ class Settings(BaseSettings):
     MAX_SEARCH_RESULTS: int = Field(default=10)
     CHUNK_SIZE: int = Field(default=1000, description="Text chunk size for embeddings")
     CHUNK_OVERLAP: int = Field(default=200, description="Overlap between chunks")
+    PDF_EXTRACTION_WORKERS: Optional[int] = Field(
+        default=None, description="Worker processes for PDF text extraction (defaults to CPU count)"
+    )
     
     # Feature Flags
     ENABLE_DOCUMENT_SEARCH: bool = Field(default=True)
     ENABLE_COMPLAINT_PROCESSING: bool = Field(default=True)
     ENABLE_REAL_TIME_UPDATES: bool = Field(default=True)
+    ENABLE_EMBEDDING_CACHE: bool = Field(
+        default=False, description="Reuse chunk embeddings from the embedding_cache table"
+    )
     
     # Security
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30)
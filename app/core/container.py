@@ -13,6 +13,7 @@ from app.repositories.conversation_repository import ConversationRepository
 from app.repositories.document_repository import DocumentRepository
 from app.repositories.complaint_repository import ComplaintRepository
 from app.repositories.vector_repository import VectorRepository
+from app.repositories.embedding_cache_repository import EmbeddingCacheRepository
 from app.services.user_service import UserService
 from app.services.conversation_service import ConversationService
 from app.services.document_service import DocumentService
@@ -93,12 +94,23 @@ class Container:
             )
         return self._repositories['vector_repo']
     
+    def get_embedding_cache_repository(self) -> EmbeddingCacheRepository:
+        if 'embedding_cache_repo' not in self._repositories:
+            self._repositories['embedding_cache_repo'] = EmbeddingCacheRepository(
+                self.get_database_provider()
+            )
+        return self._repositories['embedding_cache_repo']
+    
     # Services
     def get_embedding_service(self) -> EmbeddingService:
         if 'embedding_service' not in self._services:
             self._services['embedding_service'] = EmbeddingService(
                 provider=self.get_llm_provider(),
-                model=self.settings.EMBEDDING_MODEL
+                model=self.settings.EMBEDDING_MODEL,
+                cache_repo=(
+                    self.get_embedding_cache_repository()
+                    if self.settings.ENABLE_EMBEDDING_CACHE else None
+                )
             )
         return self._services['embedding_service']
     
@@ -108,7 +120,8 @@ class Container:
                 document_repo=self.get_document_repository(),
                 storage_provider=self.get_storage_provider(),
                 embedding_service=self.get_embedding_service(),
-                vector_repo=self.get_vector_repository()
+                vector_repo=self.get_vector_repository(),
+                extraction_workers=self.settings.PDF_EXTRACTION_WORKERS
             )
         return self._services['document_service']
     
@@ -14,11 +14,44 @@ class DatabaseProvider(ABC):
         """Get single record by ID."""
         pass
     
+    @abstractmethod
+    async def get_by_ids(
+        self, 
+        table: str, 
+        record_ids: List[Union[str, UUID]]
+    ) -> List[Dict[str, Any]]:
+        """Get multiple records by ID in a single query."""
+        pass
+    
     @abstractmethod
     async def create(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new record."""
         pass
     
+    @abstractmethod
+    async def create_many(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create multiple records using bulk inserts."""
+        pass
+    
+    @abstractmethod
+    async def upsert(self, table: str, data: Dict[str, Any], on_conflict: str = 'id') -> Dict[str, Any]:
+        """Insert a record, updating the row that conflicts on ``on_conflict``."""
+        pass
+    
+    @abstractmethod
+    async def upsert_many(
+        self, 
+        table: str, 
+        rows: List[Dict[str, Any]], 
+        on_conflict: str = 'id',
+        ignore_duplicates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Insert multiple records, updating rows that conflict on ``on_conflict``.
+        
+        With ``ignore_duplicates``, conflicting rows are left unchanged instead.
+        """
+        pass
+    
     @abstractmethod
     async def update(
         self, 
@@ -2,7 +2,7 @@
 # app/interfaces/storage_provider.py
 # =======================
 from abc import ABC, abstractmethod
-from typing import Optional, BinaryIO
+from typing import AsyncIterator, Optional, BinaryIO
 
 
 class StorageProvider(ABC):
@@ -24,6 +24,16 @@ class StorageProvider(ABC):
         """Download file content."""
         pass
     
+    @abstractmethod
+    def download_file_stream(
+        self,
+        bucket: str,
+        file_path: str,
+        chunk_size: int = 1024 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Download file content as an async stream of chunks."""
+        pass
+    
     @abstractmethod
     async def delete_file(self, bucket: str, file_path: str) -> bool:
         """Delete file."""
@@ -13,6 +13,9 @@ from app.core.exceptions import AppException
 
 logger = structlog.get_logger()
 
+# Rows sent per PostgREST request by the bulk helpers, to stay under payload limits
+MAX_ROWS_PER_REQUEST = 500
+
 
 class SupabaseProvider(DatabaseProvider):
     """Supabase database provider implementation."""
@@ -33,6 +36,26 @@ class SupabaseProvider(DatabaseProvider):
         
         return await asyncio.get_event_loop().run_in_executor(self.executor, _get)
     
+    async def get_by_ids(
+        self, 
+        table: str, 
+        record_ids: List[Union[str, UUID]]
+    ) -> List[Dict[str, Any]]:
+        """Get multiple records by ID in a single query."""
+        if not record_ids:
+            return []
+        
+        def _get_many():
+            try:
+                ids = [str(record_id) for record_id in record_ids]
+                response = self.client.table(table).select('*').in_('id', ids).execute()
+                return response.data
+            except Exception as e:
+                logger.error(f"Error getting records from {table}", error=str(e))
+                raise AppException(f"Database error: {str(e)}")
+        
+        return await asyncio.get_event_loop().run_in_executor(self.executor, _get_many)
+    
     async def create(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new record."""
         def _create():
@@ -45,6 +68,66 @@ class SupabaseProvider(DatabaseProvider):
         
         return await asyncio.get_event_loop().run_in_executor(self.executor, _create)
     
+    async def create_many(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create multiple records, inserting up to ``MAX_ROWS_PER_REQUEST`` per request."""
+        if not rows:
+            return []
+        
+        def _create_many():
+            try:
+                created = []
+                for i in range(0, len(rows), MAX_ROWS_PER_REQUEST):
+                    batch = rows[i:i + MAX_ROWS_PER_REQUEST]
+                    created.extend(self.client.table(table).insert(batch).execute().data)
+                return created
+            except Exception as e:
+                logger.error(f"Error creating records in {table}", error=str(e), count=len(rows))
+                raise AppException(f"Database error: {str(e)}")
+        
+        return await asyncio.get_event_loop().run_in_executor(self.executor, _create_many)
+    
+    async def upsert(self, table: str, data: Dict[str, Any], on_conflict: str = 'id') -> Dict[str, Any]:
+        """Insert a record, updating the row that conflicts on ``on_conflict``."""
+        def _upsert():
+            try:
+                response = self.client.table(table).upsert(data, on_conflict=on_conflict).execute()
+                return response.data[0]
+            except Exception as e:
+                logger.error(f"Error upserting record in {table}", error=str(e), data=data)
+                raise AppException(f"Database error: {str(e)}")
+        
+        return await asyncio.get_event_loop().run_in_executor(self.executor, _upsert)
+    
+    async def upsert_many(
+        self, 
+        table: str, 
+        rows: List[Dict[str, Any]], 
+        on_conflict: str = 'id',
+        ignore_duplicates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Insert multiple records, updating rows that conflict on ``on_conflict``.
+        
+        With ``ignore_duplicates``, conflicting rows are left unchanged instead.
+        """
+        if not rows:
+            return []
+        
+        def _upsert():
+            try:
+                upserted = []
+                for i in range(0, len(rows), MAX_ROWS_PER_REQUEST):
+                    batch = rows[i:i + MAX_ROWS_PER_REQUEST]
+                    response = self.client.table(table).upsert(
+                        batch, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates
+                    ).execute()
+                    upserted.extend(response.data)
+                return upserted
+            except Exception as e:
+                logger.error(f"Error upserting records in {table}", error=str(e), count=len(rows))
+                raise AppException(f"Database error: {str(e)}")
+        
+        return await asyncio.get_event_loop().run_in_executor(self.executor, _upsert)
+    
     async def update(
         self, 
         table: str, 
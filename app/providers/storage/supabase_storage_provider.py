@@ -3,7 +3,8 @@
 # =======================
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, BinaryIO
+from typing import AsyncIterator, Optional, BinaryIO
+import httpx
 import structlog
 
 from supabase import Client
@@ -61,6 +62,24 @@ class SupabaseStorageProvider(StorageProvider):
         
         return await asyncio.get_event_loop().run_in_executor(self.executor, _download)
     
+    async def download_file_stream(
+        self,
+        bucket: str,
+        file_path: str,
+        chunk_size: int = 1024 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Download file content as an async stream of chunks."""
+        signed_url = await self.get_signed_url(bucket, file_path, expires_in=300)
+        try:
+            async with httpx.AsyncClient() as client:
+                async with client.stream("GET", signed_url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        yield chunk
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming file from {bucket}", error=str(e), file_path=file_path)
+            raise AppException(f"Storage error: {str(e)}")
+    
     async def delete_file(self, bucket: str, file_path: str) -> bool:
         """Delete file."""
         def _delete():
@@ -28,6 +28,15 @@ class BaseRepository(Generic[T]):
             logger.error(f"Error getting {self.table_name} by ID", record_id=str(record_id), error=str(e))
             raise
     
+    async def get_by_ids(self, record_ids: List[Union[str, UUID]]) -> Dict[str, Dict[str, Any]]:
+        """Get multiple records by ID, keyed by ID."""
+        try:
+            records = await self.db.get_by_ids(self.table_name, record_ids)
+            return {str(record['id']): record for record in records}
+        except Exception as e:
+            logger.error(f"Error getting {self.table_name} by IDs", count=len(record_ids), error=str(e))
+            raise
+    
     async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new record."""
         try:
@@ -36,6 +45,14 @@ class BaseRepository(Generic[T]):
             logger.error(f"Error creating {self.table_name}", data=data, error=str(e))
             raise
     
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create multiple records using bulk inserts."""
+        try:
+            return await self.db.create_many(self.table_name, rows)
+        except Exception as e:
+            logger.error(f"Error creating {self.table_name} records", count=len(rows), error=str(e))
+            raise
+    
     async def update(self, record_id: Union[str, UUID], updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update existing record."""
         try:
@@ -0,0 +1,38 @@
+# =======================
+# app/repositories/embedding_cache_repository.py
+# =======================
+import json
+from typing import List, Dict
+from app.repositories.base import BaseRepository
+from app.interfaces.database_provider import DatabaseProvider
+
+
+class EmbeddingCacheRepository(BaseRepository):
+    """Embedding cache repository keyed by content hash.
+    
+    Rows live in the ``embedding_cache`` table with columns ``id`` (SHA-256 hex
+    of model and text, primary key), ``model`` and ``embedding``.
+    """
+    
+    def __init__(self, db_provider: DatabaseProvider):
+        super().__init__(db_provider, 'embedding_cache')
+    
+    async def get_many(self, content_hashes: List[str]) -> Dict[str, List[float]]:
+        """Get cached embeddings for the given content hashes."""
+        records = await self.get_by_ids(content_hashes)
+        embeddings = {}
+        for content_hash, record in records.items():
+            embedding = record['embedding']
+            # pgvector columns come back from PostgREST as '[x,y,...]' strings
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding)
+            embeddings[content_hash] = embedding
+        return embeddings
+    
+    async def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """Store embeddings by content hash, ignoring ones already cached."""
+        rows = [
+            {'id': content_hash, 'model': model, 'embedding': embedding}
+            for content_hash, embedding in embeddings.items()
+        ]
+        await self.db.upsert_many(self.table_name, rows, on_conflict='id', ignore_duplicates=True)
@@ -109,6 +109,41 @@ class VectorRepository(BaseRepository):
                         error=str(e))
             raise
     
+    async def create_many(
+        self, 
+        chunks: List[Dict[str, Any]], 
+        batch_size: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Create document chunks in batched inserts.
+        
+        A failed batch is retried row by row so one bad chunk does not drop
+        the rest of its batch. Returns the chunks that were stored.
+        """
+        created = []
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            try:
+                created.extend(await super().create_many(batch))
+            except Exception as e:
+                logger.warning("Batch chunk insert failed, retrying individually", 
+                             batch_start=i,
+                             batch_size=len(batch),
+                             error=str(e))
+                for chunk_data in batch:
+                    try:
+                        created.append(await self.create(chunk_data))
+                    except Exception as chunk_error:
+                        logger.warning("Failed to store chunk", 
+                                     document_id=chunk_data.get('document_id'),
+                                     chunk_index=chunk_data.get('chunk_index'),
+                                     error=str(chunk_error))
+        
+        logger.info("Document chunks created", 
+                   requested=len(chunks),
+                   created=len(created))
+        
+        return created
+    
     async def get_chunks_by_document_id(self, document_id: str) -> List[Dict[str, Any]]:
         """Get all chunks for a specific document."""
         try:
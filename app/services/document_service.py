@@ -2,17 +2,21 @@
 # app/services/document_service.py
 # =======================
 import asyncio
-from typing import List, Optional, BinaryIO
+import hashlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, BinaryIO, Tuple
 import structlog
 from pathlib import Path
 import tempfile
 import os
+import numpy as np
 
 from app.repositories.document_repository import DocumentRepository
 from app.repositories.vector_repository import VectorRepository
 from app.interfaces.storage_provider import StorageProvider
 from app.services.embedding_service import EmbeddingService
 from app.utils.document_processing import DocumentProcessor
+from app.utils.vector_operations import SemanticCache, normalize_embeddings, to_pgvector
 from app.models.document import (
     DocumentType, ProcessingStatus, DocumentResponse, 
     DocumentSearchRequest, DocumentSearchResponse, DocumentChunkResponse
@@ -21,6 +25,26 @@ from app.core.exceptions import AppException
 
 logger = structlog.get_logger()
 
+# Most recent unique chunk embeddings remembered per document for reuse by
+# repeated text; float32 rows keep this to ~6 KB each at 1536 dimensions
+KNOWN_EMBEDDINGS_LIMIT = 2048
+
+
+class _CountingReader:
+    """File wrapper that counts the bytes read through it."""
+    
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self.count = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self.count += len(data)
+        return data
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
 
 class DocumentService:
     """Enhanced service for managing documents with real processing and search."""
@@ -31,16 +55,30 @@ class DocumentService:
         storage_provider: StorageProvider,
         embedding_service: EmbeddingService,
         vector_repo: VectorRepository,
-        chunking_strategy: str = "default"
+        chunking_strategy: str = "default",
+        search_cache_size: int = 512,
+        search_cache_threshold: float = 0.97,
+        embedding_batch_size: int = 100,
+        max_concurrent_processing: int = 4,
+        extraction_workers: Optional[int] = None
     ):
         self.document_repo = document_repo
         self.storage = storage_provider
         self.embeddings = embedding_service
         self.vector_repo = vector_repo
+        self.embedding_batch_size = embedding_batch_size
+        # Caps how many documents are parsed and embedded at the same time
+        self._processing_semaphore = asyncio.Semaphore(max_concurrent_processing)
         self.processor = DocumentProcessor(
             chunk_size=1000, 
             chunk_overlap=200,
-            chunking_strategy=chunking_strategy
+            chunking_strategy=chunking_strategy,
+            extraction_workers=extraction_workers
+        )
+        # Semantic cache of recent searches, keyed by search filters
+        self._search_cache = SemanticCache(
+            capacity=search_cache_size,
+            threshold=search_cache_threshold
         )
     
     async def upload_document(
@@ -50,9 +88,14 @@ class DocumentService:
         document_type: DocumentType,
         uploaded_by: str,
         faculty: Optional[str] = None,
-        academic_year: Optional[str] = None
+        academic_year: Optional[str] = None,
+        file_size: Optional[int] = None
     ) -> DocumentResponse:
-        """Upload and process a document."""
+        """Upload and process a document.
+        
+        ``file_size`` may be passed when already known (e.g. ``UploadFile.size``);
+        otherwise it is counted while the file is read for upload.
+        """
         try:
             # Validate file type
             if not filename.lower().endswith('.pdf'):
@@ -61,18 +104,17 @@ class DocumentService:
             # Generate storage path
             storage_path = f"documents/{document_type.value}/{filename}"
             
-            # Upload to storage
+            # Upload to storage, counting bytes in the same pass
+            reader = _CountingReader(file)
             storage_url = await self.storage.upload_file(
                 bucket="official-documents",
                 file_path=storage_path,
-                file=file,
+                file=reader,
                 content_type="application/pdf"
             )
             
-            # Get file size
-            file.seek(0, 2)  # Seek to end
-            file_size = file.tell()
-            file.seek(0)  # Reset to beginning
+            if file_size is None:
+                file_size = reader.count
             
             # Create document record
             document_data = {
@@ -130,6 +172,20 @@ class DocumentService:
             # Generate query embedding
             query_embedding = await self.embeddings.embed_text(request.query)
             
+            # Reuse results from a semantically equivalent recent query
+            cache_key = (
+                request.document_type.value if request.document_type else None,
+                request.faculty,
+                request.similarity_threshold,
+                request.limit
+            )
+            cached_response = self._search_cache.get(cache_key, query_embedding)
+            if cached_response is not None:
+                logger.info("Document search served from semantic cache",
+                           query=request.query,
+                           cached_query=cached_response.query)
+                return cached_response.model_copy(update={'query': request.query})
+            
             # Prepare filters
             filters = {}
             if request.document_type:
@@ -146,12 +202,15 @@ class DocumentService:
                 faculty=request.faculty
             )
             
+            # Fetch metadata for all referenced documents in one query
+            document_ids = list({result['document_id'] for result in search_results})
+            documents = await self.document_repo.get_by_ids(document_ids)
+            
             # Convert results to response format
             chunks = []
             for result in search_results:
                 try:
-                    # Get document metadata
-                    document_data = await self.document_repo.get_by_id(result['document_id'])
+                    document_data = documents.get(str(result['document_id']))
                     if not document_data:
                         logger.warning("Document not found for chunk", 
                                      document_id=result['document_id'])
@@ -194,11 +253,17 @@ class DocumentService:
                        query=request.query,
                        results_found=len(chunks))
             
-            return DocumentSearchResponse(
+            response = DocumentSearchResponse(
                 query=request.query,
                 chunks=chunks,
                 total_found=len(chunks)
             )
+            # vector_search returns [] on errors, so an empty result may be a
+            # transient failure; only cache responses with results
+            if chunks:
+                self._search_cache.put(cache_key, query_embedding, response)
+            
+            return response
             
         except Exception as e:
             logger.error("Document search failed", 
@@ -211,8 +276,28 @@ class DocumentService:
                 total_found=0
             )
     
-    async def _process_document_background(self, document_id: str, storage_path: str):
-        """Background task to process uploaded document."""
+    async def _process_document_background(
+        self, 
+        document_id: str, 
+        storage_path: str,
+        previous_metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Background task to process uploaded document, waiting for a free processing slot."""
+        async with self._processing_semaphore:
+            await self._process_document(document_id, storage_path, previous_metadata)
+    
+    async def _process_document(
+        self, 
+        document_id: str, 
+        storage_path: str,
+        previous_metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Process an uploaded document: extract, chunk, embed and store.
+        
+        ``previous_metadata`` is given when reprocessing. If the stored PDF and
+        the chunking and embedding settings are unchanged since the last
+        successful run, the existing chunks are kept and processing is skipped.
+        """
         try:
             logger.info("Starting document processing", document_id=document_id)
             
@@ -222,13 +307,34 @@ class DocumentService:
             })
             
             # Download file to temporary location
-            temp_file_path = await self._download_temp_file(storage_path)
+            temp_file_path, pdf_sha256 = await self._download_temp_file(storage_path)
             
             try:
-                # Process PDF: extract text and create chunks
-                chunks = await self.processor.process_pdf(temp_file_path, document_id)
+                processing_settings = self._processing_settings()
+                if previous_metadata is not None:
+                    # A run that stored only some of its chunks is redone, not kept
+                    if (previous_metadata.get('pdf_sha256') == pdf_sha256 and
+                            all(previous_metadata.get(key) == value
+                                for key, value in processing_settings.items()) and
+                            previous_metadata.get('chunks_created') == previous_metadata.get('total_chunks')):
+                        logger.info("Document unchanged, keeping existing chunks", 
+                                   document_id=document_id)
+                        await self.document_repo.update(document_id, {
+                            'processing_status': ProcessingStatus.COMPLETED.value
+                        })
+                        return
+                    
+                    # Replace chunks from the previous run
+                    await self.vector_repo.delete_by_document_id(document_id)
+                    self._search_cache.clear()
                 
-                if not chunks:
+                # Process PDF and embed and store chunks as they are created;
+                # document metadata is read from the same open PDF
+                pdf_metadata: Dict[str, Any] = {}
+                chunks = self.processor.process_pdf_stream(temp_file_path, document_id, pdf_metadata)
+                stored_chunks, total_chunks = await self._embed_and_store_chunks(document_id, chunks)
+                
+                if not total_chunks:
                     logger.warning("No chunks generated from document", 
                                  document_id=document_id)
                     await self.document_repo.update(document_id, {
@@ -237,51 +343,22 @@ class DocumentService:
                     })
                     return
                 
-                # Generate embeddings for all chunks
-                chunk_texts = [chunk['content'] for chunk in chunks]
-                embeddings = await self.embeddings.embed_texts(chunk_texts)
-                
-                # Store chunks with embeddings in vector database
-                stored_chunks = 0
-                for chunk, embedding in zip(chunks, embeddings):
-                    try:
-                        chunk_data = {
-                            'document_id': document_id,
-                            'content': chunk['content'],
-                            'chunk_index': chunk['chunk_index'],
-                            'page_number': chunk.get('page_number'),
-                            'section_title': chunk.get('section_title'),
-                            'start_char': chunk.get('start_char'),
-                            'end_char': chunk.get('end_char'),
-                            'character_count': chunk.get('character_count'),
-                            'chunk_metadata': chunk.get('chunk_metadata', {}),
-                            'embedding': embedding
-                        }
-                        
-                        await self.vector_repo.create(chunk_data)
-                        stored_chunks += 1
-                        
-                    except Exception as e:
-                        logger.warning("Failed to store chunk", 
-                                     document_id=document_id,
-                                     chunk_index=chunk['chunk_index'],
-                                     error=str(e))
-                        continue
-                
-                # Extract document metadata
-                pdf_metadata = await self.processor.extract_metadata(temp_file_path)
-                
                 # Update document status to completed
                 await self.document_repo.update(document_id, {
                     'processing_status': ProcessingStatus.COMPLETED.value,
                     'metadata': {
                         'chunks_created': stored_chunks,
-                        'total_chunks': len(chunks),
+                        'total_chunks': total_chunks,
                         'pdf_metadata': pdf_metadata,
+                        'pdf_sha256': pdf_sha256,
+                        **processing_settings,
                         'processing_completed_at': None  # Will be set by database
                     }
                 })
                 
+                # New chunks invalidate previously cached search results
+                self._search_cache.clear()
+                
                 logger.info("Document processing completed successfully",
                            document_id=document_id,
                            chunks_stored=stored_chunks)
@@ -296,6 +373,16 @@ class DocumentService:
                         document_id=document_id, 
                         error=str(e))
             
+            # Drop chunks stored before the failure so a FAILED document
+            # isn't searchable
+            try:
+                await self.vector_repo.delete_by_document_id(document_id)
+            except Exception as cleanup_error:
+                logger.error("Failed to delete partial document chunks", 
+                           document_id=document_id,
+                           error=str(cleanup_error))
+            self._search_cache.clear()
+            
             # Update status to failed
             try:
                 await self.document_repo.update(document_id, {
@@ -307,24 +394,128 @@ class DocumentService:
                            document_id=document_id,
                            error=str(update_error))
     
-    async def _download_temp_file(self, storage_path: str) -> str:
-        """Download file from storage to temporary local file."""
-        try:
-            # Download file content
-            file_content = await self.storage.download_file(
-                bucket="official-documents",
-                file_path=storage_path
-            )
+    def _processing_settings(self) -> Dict[str, Any]:
+        """Settings that determine a document's chunks and their vectors."""
+        return {
+            'chunking_strategy': self.processor.chunking_strategy,
+            'chunk_size': self.processor.chunk_size,
+            'chunk_overlap': self.processor.chunk_overlap,
+            'embedding_model': self.embeddings.model
+        }
+    
+    async def _embed_and_store_chunks(
+        self, 
+        document_id: str, 
+        chunks: AsyncIterator[Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        """Embed chunks in batches and store them.
+        
+        Returns ``(stored_chunks, total_chunks)``. Chunks are pulled from the
+        stream one batch at a time, and embedding and insertion run as a
+        producer/consumer pipeline so the next batch is being embedded while
+        the previous one is written. Chunks whose text repeats recently in the
+        document (headers, footers) reuse the earlier embedding instead of
+        being sent to the provider again; only the last
+        ``KNOWN_EMBEDDINGS_LIMIT`` unique embeddings are kept, so memory stays
+        bounded however long the document is.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        known_embeddings: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        total_chunks = 0
+        unique_chunks = 0
+        
+        async def embed_batch(batch: List[Dict[str, Any]]):
+            nonlocal unique_chunks
+            hashes = [chunk['chunk_metadata']['content_hash'] for chunk in batch]
             
+            vectors: Dict[str, np.ndarray] = {}
+            new_texts: Dict[str, str] = {}
+            for content_hash, chunk in zip(hashes, batch):
+                if content_hash in known_embeddings:
+                    known_embeddings.move_to_end(content_hash)
+                    vectors[content_hash] = known_embeddings[content_hash]
+                else:
+                    new_texts.setdefault(content_hash, chunk['content'])
+            
+            if new_texts:
+                embeddings = await self.embeddings.embed_texts(
+                    list(new_texts.values()), use_cache=True
+                )
+                unique_chunks += len(new_texts)
+                for content_hash, vector in zip(new_texts.keys(), normalize_embeddings(embeddings)):
+                    vectors[content_hash] = vector
+                    # Copy so a remembered row doesn't keep the whole batch matrix alive
+                    known_embeddings[content_hash] = vector.copy()
+                while len(known_embeddings) > KNOWN_EMBEDDINGS_LIMIT:
+                    known_embeddings.popitem(last=False)
+            
+            await queue.put((batch, [vectors[h] for h in hashes]))
+        
+        async def produce():
+            nonlocal total_chunks
+            try:
+                batch = []
+                async for chunk in chunks:
+                    total_chunks += 1
+                    batch.append(chunk)
+                    if len(batch) >= self.embedding_batch_size:
+                        await embed_batch(batch)
+                        batch = []
+                if batch:
+                    await embed_batch(batch)
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(None)
+        
+        producer = asyncio.create_task(produce())
+        stored_chunks = 0
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                
+                batch, vectors = item
+                # Chunk dicts already match the document_chunks columns, so
+                # attach the embedding in place rather than copying each row
+                for chunk, vector in zip(batch, vectors):
+                    chunk['embedding'] = to_pgvector(vector)
+                stored_chunks += len(await self.vector_repo.create_many(batch))
+        finally:
+            producer.cancel()
+        
+        logger.info("Chunk embeddings generated",
+                   document_id=document_id,
+                   total_chunks=total_chunks,
+                   unique_chunks=unique_chunks)
+        
+        return stored_chunks, total_chunks
+    
+    async def _download_temp_file(self, storage_path: str) -> Tuple[str, str]:
+        """Stream file from storage to temporary local file.
+        
+        Returns the temporary path and the SHA-256 hex digest of the content.
+        """
+        try:
             # Create temporary file
             temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+            loop = asyncio.get_event_loop()
+            sha256 = hashlib.sha256()
             
             try:
-                # Write content to temporary file
+                # Write chunks as they arrive instead of buffering the whole file
                 with os.fdopen(temp_fd, 'wb') as temp_file:
-                    temp_file.write(file_content)
+                    async for chunk in self.storage.download_file_stream(
+                        bucket="official-documents",
+                        file_path=storage_path
+                    ):
+                        sha256.update(chunk)
+                        await loop.run_in_executor(None, temp_file.write, chunk)
                 
-                return temp_path
+                return temp_path, sha256.hexdigest()
                 
             except Exception as e:
                 # Clean up on error
@@ -375,13 +566,12 @@ class DocumentService:
             if not document_data:
                 raise AppException("Document not found", status_code=404)
             
-            # Delete existing chunks
-            await self.vector_repo.delete_by_document_id(document_id)
-            
-            # Trigger reprocessing
+            # Trigger reprocessing; existing chunks are replaced unless the
+            # document content is unchanged
             asyncio.create_task(self._process_document_background(
                 document_id, 
-                document_data['storage_path']
+                document_data['storage_path'],
+                previous_metadata=document_data.get('metadata') or {}
             ))
             
             return True
@@ -1,10 +1,12 @@
 # =======================
 # app/services/embedding_service.py
 # =======================
-from typing import List
+import hashlib
+from typing import Dict, List, Optional
 import structlog
 
 from app.interfaces.llm_provider import LLMProvider
+from app.repositories.embedding_cache_repository import EmbeddingCacheRepository
 from app.core.exceptions import AppException
 
 logger = structlog.get_logger()
@@ -13,21 +15,70 @@ logger = structlog.get_logger()
 class EmbeddingService:
     """Service for generating text embeddings."""
     
-    def __init__(self, provider: LLMProvider, model: str = "text-embedding-ada-002"):
+    def __init__(
+        self,
+        provider: LLMProvider,
+        model: str = "text-embedding-ada-002",
+        cache_repo: Optional[EmbeddingCacheRepository] = None
+    ):
         self.provider = provider
         self.model = model
+        self.cache_repo = cache_repo
     
     async def embed_text(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        embeddings = await self.embed_texts([text])
+        # Single texts are user queries: skip the cache round-trips and don't persist them
+        embeddings = await self.embed_texts([text], use_cache=False)
         return embeddings[0]
     
-    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts."""
+    async def embed_texts(self, texts: List[str], use_cache: bool = False) -> List[List[float]]:
+        """Generate embeddings for multiple texts.
+        
+        With ``use_cache``, embeddings already in the embedding cache are reused
+        and newly generated ones are stored. Meant for document ingestion, where
+        the same content is embedded again on reprocessing.
+        """
+        if not use_cache or self.cache_repo is None or not texts:
+            return await self._generate(texts)
+        
+        hashes = [self._content_hash(text) for text in texts]
+        
+        try:
+            embeddings = await self.cache_repo.get_many(list(set(hashes)))
+        except Exception as e:
+            logger.warning("Embedding cache lookup failed", error=str(e))
+            embeddings = {}
+        
+        # Embed each uncached text once
+        missing: Dict[str, str] = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in embeddings:
+                missing.setdefault(content_hash, text)
+        
+        if missing:
+            generated = await self._generate(list(missing.values()))
+            new_embeddings = dict(zip(missing.keys(), generated))
+            embeddings.update(new_embeddings)
+            
+            try:
+                await self.cache_repo.put_many(self.model, new_embeddings)
+            except Exception as e:
+                logger.warning("Embedding cache update failed", error=str(e))
+        
+        logger.info("Embeddings resolved",
+                   total=len(texts),
+                   generated=len(missing))
+        
+        return [embeddings[content_hash] for content_hash in hashes]
+    
+    async def _generate(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings with the provider."""
         try:
             return await self.provider.generate_embeddings(texts)
         except Exception as e:
             logger.error("Error generating embeddings", error=str(e))
             raise AppException(f"Failed to generate embeddings: {str(e)}")
-
-
+    
+    def _content_hash(self, text: str) -> str:
+        """Cache key for a text under the configured model."""
+        return hashlib.sha256(f"{self.model}\0{text}".encode('utf-8', 'surrogatepass')).hexdigest()
@@ -2,29 +2,416 @@
 # app/utils/document_processing.py
 # =======================
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import copy
+import hashlib
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
+import numpy as np
 import structlog
 from pathlib import Path
 import pypdf
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
 # Import the enhanced TextChunker for alternative chunking strategies
-from app.utils.text_chunking import TextChunker
+from app.utils.text_chunking import PageIndex, TextChunker, detect_language_indicators
 
 logger = structlog.get_logger()
 
+# Below this many pages, worker start-up costs more than parallel extraction saves
+PARALLEL_EXTRACTION_MIN_PAGES = 16
+PAGES_PER_EXTRACTION_TASK = 4
+# Chunks produced per hop onto the processor's executor by TextChunker strategies
+CHUNKS_PER_EXECUTOR_CALL = 64
+
+
+def _code_points(text: str) -> np.ndarray:
+    """View ``text`` as an array of code points indexed like the string itself."""
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    # UTF-32 is fixed width, so array offsets stay equal to character offsets;
+    # pypdf can emit lone surrogates, which surrogatepass keeps as one unit each
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+
+def _boundary_positions(codes: np.ndarray, pattern: str) -> np.ndarray:
+    """Return the sorted start offsets of every (possibly overlapping) match of ``pattern``."""
+    # Vectorised comparison of each pattern character against shifted views
+    span = len(codes) - len(pattern) + 1
+    matches = codes[:span] == ord(pattern[0])
+    for offset, char in enumerate(pattern[1:], 1):
+        matches &= codes[offset:offset + span] == ord(char)
+    return np.flatnonzero(matches)
+
+
+def _last_boundary(positions: np.ndarray, width: int, start: int, end: int) -> int:
+    """Equivalent of ``text.rfind(pattern, start, end)`` over precomputed positions."""
+    i = int(np.searchsorted(positions, end - width, side='right')) - 1
+    if i >= 0 and positions[i] >= start:
+        return int(positions[i])
+    return -1
+
+
+# Document info entries reported by every backend's ``info()``
+_INFO_KEYS = ('Title', 'Author', 'Subject', 'Creator')
+
+
+class _PypdfDocument:
+    """Pure-Python pypdf backend, reading through a memory map."""
+    
+    def __init__(self, file_path: str):
+        self._file = open(file_path, 'rb')
+        try:
+            # Memory-map the file so only the pages pypdf touches are paged in
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                self._mapped.madvise(mmap.MADV_SEQUENTIAL)
+            self.reader = pypdf.PdfReader(self._mapped)
+            self.page_count = len(self.reader.pages)
+        except Exception:
+            self.close()
+            raise
+    
+    def page_text(self, page_num: int) -> str:
+        return self.reader.pages[page_num].extract_text()
+    
+    def info(self) -> Dict[str, Any]:
+        info = self.reader.metadata or {}
+        return {key: info.get(f'/{key}') for key in _INFO_KEYS}
+    
+    def close(self):
+        if getattr(self, '_mapped', None) is not None:
+            self._mapped.close()
+        self._file.close()
+
+
+# PDFium is not thread-safe, so calls into it are serialised within a process
+_PDFIUM_LOCK = threading.Lock()
+
+
+class _PdfiumDocument:
+    """PDFium backend; text extraction runs in native code."""
+    
+    def __init__(self, file_path: str):
+        with _PDFIUM_LOCK:
+            self.pdf = pdfium.PdfDocument(file_path)
+            self.page_count = len(self.pdf)
+    
+    def page_text(self, page_num: int) -> str:
+        with _PDFIUM_LOCK:
+            page = self.pdf[page_num]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    # Normalise to pypdf's layout: LF line endings and a trailing
+                    # newline, so pages stay separated by a blank line when joined
+                    text = textpage.get_text_range().replace('\r\n', '\n')
+                    if text and not text.endswith('\n'):
+                        text += '\n'
+                    return text
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+    
+    def info(self) -> Dict[str, Any]:
+        with _PDFIUM_LOCK:
+            info = self.pdf.get_metadata_dict(skip_empty=True)
+        return {key: info.get(key) for key in _INFO_KEYS}
+    
+    def close(self):
+        with _PDFIUM_LOCK:
+            self.pdf.close()
+
+
+# PyMuPDF is not thread-safe either
+_PYMUPDF_LOCK = threading.Lock()
+
+
+class _PymupdfDocument:
+    """PyMuPDF (MuPDF) backend; text extraction runs in native code."""
+    
+    def __init__(self, file_path: str):
+        with _PYMUPDF_LOCK:
+            self.pdf = pymupdf.open(file_path)
+            self.page_count = self.pdf.page_count
+    
+    def page_text(self, page_num: int) -> str:
+        with _PYMUPDF_LOCK:
+            text = self.pdf.load_page(page_num).get_text()
+        # Same layout normalisation as the PDFium backend
+        text = text.replace('\r\n', '\n')
+        if text and not text.endswith('\n'):
+            text += '\n'
+        return text
+    
+    def info(self) -> Dict[str, Any]:
+        with _PYMUPDF_LOCK:
+            info = self.pdf.metadata or {}
+        return {key: info.get(key.lower()) or None for key in _INFO_KEYS}
+    
+    def close(self):
+        with _PYMUPDF_LOCK:
+            self.pdf.close()
+
+
+def _open_pdf_document(file_path: str):
+    """Open a PDF with the first backend that is installed and can read it.
+    
+    PDFium and PyMuPDF both extract text in native code; pypdf is the
+    pure-Python fallback.
+    """
+    if pdfium is not None:
+        try:
+            return _PdfiumDocument(file_path)
+        except pdfium.PdfiumError as e:
+            logger.warning("PDFium could not open PDF", 
+                         file_path=file_path, error=str(e))
+    if pymupdf is not None:
+        try:
+            return _PymupdfDocument(file_path)
+        except pymupdf.FileDataError as e:
+            logger.warning("PyMuPDF could not open PDF", 
+                         file_path=file_path, error=str(e))
+    return _PypdfDocument(file_path)
+
+
+def _read_pdf_metadata(document: Any) -> Dict[str, Any]:
+    """Build the document metadata dict from an already-open PDF."""
+    metadata = {'page_count': document.page_count}
+    try:
+        info = document.info()
+    except Exception as e:
+        logger.warning("Metadata extraction failed", error=str(e))
+        info = {}
+    metadata.update({key.lower(): info.get(key) for key in _INFO_KEYS})
+    return metadata
+
+
+def _open_pdf_with_metadata(file_path: str) -> Tuple[Any, Dict[str, Any]]:
+    """Open a PDF and read its metadata in the same call."""
+    document = _open_pdf_document(file_path)
+    return document, _read_pdf_metadata(document)
+
+
+def _extract_page_texts(document: Any, page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """Extract text for the given zero-based page numbers, skipping failed pages."""
+    page_texts = []
+    for page_num in page_numbers:
+        try:
+            page_texts.append((page_num, document.page_text(page_num)))
+        except Exception as e:
+            logger.warning("Failed to extract text from page", 
+                         page=page_num, error=str(e))
+    return page_texts
+
+
+def _extract_pages_from_file(file_path: str, page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """Worker entry point: open the PDF independently and extract a batch of pages."""
+    document = _open_pdf_document(file_path)
+    try:
+        return _extract_page_texts(document, page_numbers)
+    finally:
+        document.close()
+
+
+async def _as_async_iter(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def _iter_text_segments(page_texts: AsyncIterator[Tuple[int, str]], 
+                              page_index: PageIndex) -> AsyncIterator[str]:
+    """Join extracted pages into the document text, one segment per page.
+    
+    Pages without text are skipped and the rest are separated by a newline.
+    Each page's boundaries are added to ``page_index`` before its text is
+    yielded.
+    """
+    current_position = 0
+    
+    async for page_num, page_text in page_texts:
+        # isspace() stops at the first character with text, strip() would copy the page
+        if not page_text or page_text.isspace():
+            continue
+        
+        segment = page_text
+        if page_index.pages:
+            # Join with newlines to preserve page boundaries
+            segment = "\n" + page_text
+            current_position += 1
+        
+        # Store page boundary information
+        page_index.append({
+            'page_number': page_num + 1,
+            'start_char': current_position,
+            'end_char': current_position + len(page_text),
+            'text_length': len(page_text)
+        })
+        current_position += len(page_text)
+        
+        yield segment
+
+
+class _DefaultChunkBuilder:
+    """Default chunking over text that arrives in consecutive segments.
+    
+    ``feed`` returns the chunks whose end can be placed once a segment has
+    arrived and ``finish`` the rest. The result is the same as chunking the
+    concatenated text in one go.
+    """
+    
+    def __init__(self, processor: 'DocumentProcessor', document_id: str, page_index: PageIndex):
+        self.processor = processor
+        self.document_id = document_id
+        self.page_index = page_index
+        # Only text from the current chunk start onwards is kept in ``window``;
+        # all offsets are positions in the full text
+        self.window = ""
+        self.window_start = 0
+        self.text_length = 0
+        self.paragraph_breaks = np.empty(0, dtype=np.int64)
+        self.sentence_breaks = np.empty(0, dtype=np.int64)
+        self.start = 0
+        self.chunk_index = 0
+    
+    def feed(self, segment: str) -> List[Dict[str, Any]]:
+        """Append the next segment of text and return the chunks it completes."""
+        start = self.start
+        window = self.window[start - self.window_start:] + segment
+        text_length = self.text_length
+        
+        # Locate boundaries in the new text, starting one character early so a
+        # paragraph break spanning the seam is found
+        scan_start = max(text_length - 1, start)
+        codes = _code_points(window[scan_start - start:])
+        self.paragraph_breaks = np.concatenate((
+            self.paragraph_breaks[self.paragraph_breaks >= start],
+            _boundary_positions(codes, '\n\n') + scan_start
+        ))
+        self.sentence_breaks = np.concatenate((
+            self.sentence_breaks[self.sentence_breaks >= start],
+            _boundary_positions(codes[text_length - scan_start:], '.') + text_length
+        ))
+        
+        self.window = window
+        self.window_start = start
+        self.text_length = text_length + len(segment)
+        return self._take_chunks(exhausted=False)
+    
+    def finish(self) -> List[Dict[str, Any]]:
+        """Return the chunks left once all text has arrived."""
+        return self._take_chunks(exhausted=True)
+    
+    def _take_chunks(self, exhausted: bool) -> List[Dict[str, Any]]:
+        processor = self.processor
+        chunk_size = processor.chunk_size
+        window = self.window
+        window_start = self.window_start
+        text_length = self.text_length
+        start = self.start
+        chunks = []
+        
+        while start < text_length:
+            # Calculate end position
+            end = start + chunk_size
+            
+            # If we're not at the end, try to break at a good boundary
+            if end < text_length:
+                # Try to break at paragraph boundary first
+                paragraph_break = _last_boundary(self.paragraph_breaks, 2, start, end)
+                if paragraph_break > start + (chunk_size * 0.3):
+                    end = paragraph_break
+                else:
+                    # Try to break at sentence boundary
+                    sentence_break = _last_boundary(self.sentence_breaks, 1, start, end)
+                    if sentence_break > start + (chunk_size * 0.5):
+                        end = sentence_break + 1
+            elif not exhausted:
+                # This may be the last chunk; wait until more text arrives
+                break
+            
+            # Extract chunk text, unless the span is too short to be kept anyway
+            chunk_text = ''
+            if min(end, text_length) - start > 50:
+                chunk_text = window[start - window_start:end - window_start].strip()
+            
+            if len(chunk_text) > 50:  # Only include substantial chunks
+                # Determine page number based on character position
+                page_number = self.page_index.page_number(start, end)
+                
+                # Extract section title if present
+                section_title = processor._extract_section_title(chunk_text)
+                
+                # Build chunk metadata
+                chunk_metadata = processor._build_chunk_metadata(chunk_text, start, end)
+                
+                chunks.append({
+                    'document_id': self.document_id,
+                    'content': chunk_text,
+                    'chunk_index': self.chunk_index,
+                    'page_number': page_number,
+                    'section_title': section_title,
+                    'start_char': start,
+                    'end_char': end,
+                    'character_count': len(chunk_text),
+                    'chunk_metadata': chunk_metadata
+                })
+                self.chunk_index += 1
+            
+            # Move to next chunk with overlap
+            start = max(end - processor.chunk_overlap, start + 1)
+        
+        self.start = start
+        return chunks
+
 
 class DocumentProcessor:
     """PDF processing utilities for document extraction and chunking."""
     
+    # Patterns used per chunk, compiled once
+    # Leading numbering, then roman numerals, stripped from section titles
+    _TITLE_PREFIX_RE = re.compile(r'^(?:\d+\.\s*)?(?:[IVX]+\.\s*)?')
+    _NUMBER_RE = re.compile(r'\d+')
+    _FORMULA_RE = re.compile(r'[=+\-*/]\s*\d+')
+    _NUMBERED_HEADING_RE = re.compile(r'^\d+\.\s+[A-Z]')
+    
+    # Strategies implemented by TextChunker; anything else uses the default chunker
+    _TEXT_CHUNKER_STRATEGIES = ("sentences", "paragraphs", "semantic")
+    
     def __init__(self, 
                  chunk_size: int = 1000, 
                  chunk_overlap: int = 200,
-                 chunking_strategy: str = "default"):
+                 chunking_strategy: str = "default",
+                 extraction_workers: Optional[int] = None):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.chunking_strategy = chunking_strategy  # "default", "sentences", "paragraphs", "semantic"
+        # Worker processes used for per-page text extraction of large PDFs
+        self.extraction_workers = extraction_workers or os.cpu_count() or 1
+        self._extraction_pool: Optional[ProcessPoolExecutor] = None
+        self._extraction_pool_lock = threading.Lock()
+        # Runs all blocking work (opening PDFs, extraction, chunking) off the event loop
+        self.executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
         # Store page boundary information for better tracking
         self.page_boundaries = []
+        # Reused across documents for the alternative chunking strategies
+        self._chunker: Optional[TextChunker] = None
         self.section_patterns = [
             r'^[A-ZÁÉÍÓÚÑ\s]{5,50}$',  # All caps titles
             r'^\d+\.\s+[A-Za-záéíóúñÁÉÍÓÚÑ][^.]{10,80}$',  # Numbered sections
@@ -32,287 +419,346 @@ class DocumentProcessor:
             r'^Capítulo\s+\d+',  # Chapter titles
             r'^CAPÍTULO\s+[IVX\d]+',  # Chapter titles (caps)
         ]
+        # One alternation so each line needs a single match attempt
+        self._section_regex = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.section_patterns), re.IGNORECASE
+        )
     
     async def process_pdf(self, file_path: str, document_id: str) -> List[Dict[str, Any]]:
         """Process PDF file: extract text and create chunks."""
+        return [chunk async for chunk in self.process_pdf_stream(file_path, document_id)]
+    
+    async def open_and_process(self, file_path: str, document_id: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Process PDF file, returning its metadata and chunks from a single open."""
+        pdf_metadata: Dict[str, Any] = {}
+        chunks = [
+            chunk async for chunk in self.process_pdf_stream(file_path, document_id, pdf_metadata)
+        ]
+        return pdf_metadata, chunks
+    
+    async def process_pdf_stream(self, 
+                                 file_path: str, 
+                                 document_id: str, 
+                                 pdf_metadata: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process PDF file, yielding chunks as they are created.
+        
+        Lets callers embed and store chunks in batches without holding every
+        chunk of a large document in memory. If ``pdf_metadata`` is given, it is
+        filled with the document metadata read from the same open document.
+        """
         try:
-            # Extract text from PDF with page tracking
-            text, page_info = await self._extract_pdf_text(file_path)
+            if self.chunking_strategy in self._TEXT_CHUNKER_STRATEGIES:
+                # These strategies split the whole text, so extract it first
+                text, page_info = await self._extract_pdf_text(file_path, pdf_metadata)
+                
+                # Store page boundaries for character position mapping
+                self.page_boundaries = page_info
+                chunks = self._iter_chunks(text, document_id)
+            else:
+                # Chunk pages as they are extracted, while later pages are
+                # still being extracted
+                page_index = PageIndex()
+                page_info = page_index.pages
+                segments = _iter_text_segments(
+                    self._iter_page_texts(file_path, pdf_metadata), page_index
+                )
+                chunks = self._iter_default_chunks(segments, document_id, page_index)
+            
+            # Create chunks with enhanced metadata
+            chunks_created = 0
+            async for chunk in chunks:
+                chunks_created += 1
+                yield chunk
             
-            if not text.strip():
+            if not page_info:
                 logger.warning("No text extracted from PDF", document_id=document_id)
-                return []
+                return
             
-            # Store page boundaries for character position mapping
             self.page_boundaries = page_info
             
-            # Create chunks with enhanced metadata
-            chunks = await self._chunk_text(text, document_id)
-            
             logger.info("PDF processed successfully", 
                        document_id=document_id, 
-                       chunks_created=len(chunks),
-                       text_length=len(text),
+                       chunks_created=chunks_created,
+                       text_length=page_info[-1]['end_char'],
                        pages_processed=len(page_info))
             
-            return chunks
-            
         except Exception as e:
             logger.error("PDF processing failed", 
                         document_id=document_id, 
                         error=str(e))
             raise
     
-    async def _extract_pdf_text(self, file_path: str) -> Tuple[str, List[Dict[str, Any]]]:
-        """Extract text from PDF file using pypdf, preserving page boundaries."""
-        if not pypdf:
-            raise ImportError("pypdf not available. Install with: pip install pypdf")
+    async def process_pdfs(self, 
+                           items: List[Tuple[str, str]], 
+                           concurrency: Optional[int] = None) -> List[Union[List[Dict[str, Any]], BaseException]]:
+        """Process several ``(file_path, document_id)`` pairs concurrently.
         
-        def _extract():
-            try:
-                with open(file_path, 'rb') as file:
-                    reader = pypdf.PdfReader(file)
-                    text_parts = []
-                    page_info = []
-                    current_position = 0
-                    
-                    for page_num, page in enumerate(reader.pages):
-                        try:
-                            page_text = page.extract_text()
-                            if page_text.strip():
-                                # Store page boundary information
-                                page_start = current_position
-                                page_end = current_position + len(page_text)
-                                
-                                page_info.append({
-                                    'page_number': page_num + 1,
-                                    'start_char': page_start,
-                                    'end_char': page_end,
-                                    'text_length': len(page_text)
-                                })
-                                
-                                text_parts.append(page_text)
-                                current_position = page_end + 1  # +1 for the newline we'll add
-                                
-                        except Exception as e:
-                            logger.warning("Failed to extract text from page", 
-                                         page=page_num, error=str(e))
-                            continue
-                    
-                    # Join with newlines to preserve page boundaries
-                    full_text = "\n".join(text_parts)
-                    return full_text, page_info
-                    
-            except Exception as e:
-                logger.error("PDF text extraction failed", file_path=file_path, error=str(e))
-                raise
+        Results come back in input order; a PDF that fails yields its exception
+        instead of a chunk list, so one bad file doesn't sink the batch.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.extraction_workers)
+        
+        async def _process_one(file_path: str, document_id: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.process_pdf(file_path, document_id)
         
-        # Run in thread pool to avoid blocking
+        return await asyncio.gather(
+            *(_process_one(file_path, document_id) for file_path, document_id in items),
+            return_exceptions=True
+        )
+    
+    async def _extract_pdf_text(self, 
+                                file_path: str, 
+                                pdf_metadata: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Extract text from PDF file, preserving page boundaries."""
+        page_index = PageIndex()
+        page_texts = self._iter_page_texts(file_path, pdf_metadata)
+        segments = [
+            segment async for segment in _iter_text_segments(page_texts, page_index)
+        ]
+        return "".join(segments), page_index.pages
+    
+    async def _iter_page_texts(self, 
+                               file_path: str, 
+                               pdf_metadata: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[int, str]]:
+        """Yield ``(page_num, text)`` for each page, in order, as it is extracted.
+        
+        Uses PDFium or PyMuPDF when installed and falls back to pypdf. The
+        document metadata is read into ``pdf_metadata``, when given, while the
+        document is open.
+        Large PDFs are split into batches that are all submitted to the process
+        pool up front and awaited in order, so later pages keep extracting while
+        earlier ones are consumed.
+        """
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _extract)
+        try:
+            # Run in thread pool to avoid blocking
+            if pdf_metadata is None:
+                document = await loop.run_in_executor(self.executor, _open_pdf_document, file_path)
+            else:
+                document, metadata = await loop.run_in_executor(
+                    self.executor, _open_pdf_with_metadata, file_path
+                )
+                pdf_metadata.update(metadata)
+            try:
+                page_count = document.page_count
+                batches = [
+                    list(range(i, min(i + PAGES_PER_EXTRACTION_TASK, page_count)))
+                    for i in range(0, page_count, PAGES_PER_EXTRACTION_TASK)
+                ]
+                parallel = (self.extraction_workers > 1 and
+                            page_count >= PARALLEL_EXTRACTION_MIN_PAGES)
+                if not parallel:
+                    for batch in batches:
+                        page_texts = await loop.run_in_executor(
+                            self.executor, _extract_page_texts, document, batch
+                        )
+                        for page_text in page_texts:
+                            yield page_text
+            finally:
+                document.close()
+            
+            if parallel:
+                # pypdf extraction is CPU-bound Python, so fan pages out to processes
+                pool = self._get_extraction_pool()
+                futures = [
+                    loop.run_in_executor(pool, _extract_pages_from_file, file_path, batch)
+                    for batch in batches
+                ]
+                try:
+                    for future in futures:
+                        for page_text in await future:
+                            yield page_text
+                except BrokenProcessPool:
+                    # A worker died; start a fresh pool on the next call
+                    self._discard_extraction_pool(pool)
+                    raise
+                finally:
+                    for future in futures:
+                        future.cancel()
+                    
+        except Exception as e:
+            logger.error("PDF text extraction failed", file_path=file_path, error=str(e))
+            raise
+    
+    def _get_extraction_pool(self) -> ProcessPoolExecutor:
+        """Return the shared extraction pool, starting it on first use."""
+        with self._extraction_pool_lock:
+            if self._extraction_pool is None:
+                self._extraction_pool = ProcessPoolExecutor(
+                    max_workers=self.extraction_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._extraction_pool
+    
+    def _discard_extraction_pool(self, pool: ProcessPoolExecutor):
+        with self._extraction_pool_lock:
+            if self._extraction_pool is pool:
+                self._extraction_pool = None
+        pool.shutdown(wait=False)
+    
+    def close(self):
+        """Shut down the executor and any extraction worker processes."""
+        with self._extraction_pool_lock:
+            pool, self._extraction_pool = self._extraction_pool, None
+        if pool is not None:
+            pool.shutdown()
+        self.executor.shutdown()
     
     async def _chunk_text(self, text: str, document_id: str) -> List[Dict[str, Any]]:
         """Split text into overlapping chunks for embeddings with enhanced metadata."""
-        if not text.strip():
-            return []
+        return [chunk async for chunk in self._iter_chunks(text, document_id)]
+    
+    async def _iter_chunks(self, text: str, document_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield overlapping chunks for embeddings with enhanced metadata."""
+        if not text or text.isspace():
+            return
         
         # Use alternative chunking strategies if specified
-        if self.chunking_strategy != "default":
-            return await self._chunk_text_with_strategy(text, document_id)
+        strategy_chunks = self._iter_chunks_with_strategy(text, document_id)
+        if strategy_chunks is not None:
+            # Pull chunks on the executor, a slice at a time
+            loop = asyncio.get_event_loop()
+            while True:
+                chunks = await loop.run_in_executor(
+                    self.executor, list, islice(strategy_chunks, CHUNKS_PER_EXECUTOR_CALL)
+                )
+                if not chunks:
+                    return
+                for chunk in chunks:
+                    yield chunk
         
         # Default chunking strategy (existing implementation)
-        chunks = []
-        start = 0
-        chunk_index = 0
+        async for chunk in self._iter_default_chunks(_as_async_iter([text]), document_id, self._page_index):
+            yield chunk
+    
+    async def _iter_default_chunks(self, 
+                                   segments: AsyncIterator[str], 
+                                   document_id: str,
+                                   page_index: PageIndex) -> AsyncIterator[Dict[str, Any]]:
+        """Default chunking over text that arrives in consecutive segments.
         
-        while start < len(text):
-            # Calculate end position
-            end = start + self.chunk_size
-            
-            # If we're not at the end, try to break at a good boundary
-            if end < len(text):
-                # Try to break at paragraph boundary first
-                paragraph_break = text.rfind('\n\n', start, end)
-                if paragraph_break > start + (self.chunk_size * 0.3):
-                    end = paragraph_break
-                else:
-                    # Try to break at sentence boundary
-                    sentence_break = text.rfind('.', start, end)
-                    if sentence_break > start + (self.chunk_size * 0.5):
-                        end = sentence_break + 1
-            
-            # Extract chunk text
-            chunk_text = text[start:end].strip()
-            
-            if chunk_text and len(chunk_text) > 50:  # Only include substantial chunks
-                # Determine page number based on character position
-                page_number = self._determine_page_number(start, end)
-                
-                # Extract section title if present
-                section_title = self._extract_section_title(chunk_text)
-                
-                # Build chunk metadata
-                chunk_metadata = self._build_chunk_metadata(chunk_text, start, end)
-                
-                chunks.append({
-                    'document_id': document_id,
-                    'content': chunk_text,
-                    'chunk_index': chunk_index,
-                    'page_number': page_number,
-                    'section_title': section_title,
-                    'start_char': start,
-                    'end_char': end,
-                    'character_count': len(chunk_text),
-                    'chunk_metadata': chunk_metadata
-                })
-                chunk_index += 1
-            
-            # Move to next chunk with overlap
-            start = max(end - self.chunk_overlap, start + 1)
-            
-            # Safety check to prevent infinite loop
-            if start >= len(text):
-                break
+        Each segment is chunked on the processor's executor as soon as it
+        arrives, so chunking streamed pages overlaps their extraction and stays
+        off the event loop.
+        """
+        builder = _DefaultChunkBuilder(self, document_id, page_index)
+        loop = asyncio.get_event_loop()
         
-        return chunks
+        async for segment in segments:
+            for chunk in await loop.run_in_executor(self.executor, builder.feed, segment):
+                yield chunk
+        
+        for chunk in await loop.run_in_executor(self.executor, builder.finish):
+            yield chunk
 
-    async def _chunk_text_with_strategy(self, text: str, document_id: str) -> List[Dict[str, Any]]:
-        """Use alternative chunking strategies via TextChunker."""
-        chunker = TextChunker(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            page_boundaries=self.page_boundaries
-        )
+    def _iter_chunks_with_strategy(self, text: str, document_id: str) -> Optional[Iterator[Dict[str, Any]]]:
+        """Use alternative chunking strategies via TextChunker.
+        
+        Returns None for the default (or an unknown) strategy.
+        """
+        if self.chunking_strategy not in self._TEXT_CHUNKER_STRATEGIES:
+            return None
+        
+        chunker = self._chunker
+        if chunker is None or (chunker.chunk_size, chunker.chunk_overlap) != (self.chunk_size, self.chunk_overlap):
+            chunker = self._chunker = TextChunker(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap
+            )
+        # Shallow copy so each document gets its own page boundaries while
+        # sharing the compiled patterns
+        chunker = copy.copy(chunker)
+        chunker.page_boundaries = self.page_boundaries
         
         if self.chunking_strategy == "sentences":
-            return chunker.chunk_by_sentences(text, document_id)
+            return chunker.iter_by_sentences(text, document_id)
         elif self.chunking_strategy == "paragraphs":
-            return chunker.chunk_by_paragraphs(text, document_id)
-        elif self.chunking_strategy == "semantic":
-            return chunker.chunk_by_semantic_sections(text, document_id)
+            return chunker.iter_by_paragraphs(text, document_id)
         else:
-            # Fallback to default strategy
-            return await self._chunk_text(text, document_id)
+            return chunker.iter_by_semantic_sections(text, document_id)
+    
+    @property
+    def page_boundaries(self) -> List[Dict[str, Any]]:
+        return self._page_boundaries
+    
+    @page_boundaries.setter
+    def page_boundaries(self, page_boundaries: List[Dict[str, Any]]):
+        self._page_boundaries = page_boundaries
+        self._page_index = PageIndex(page_boundaries)
     
     def _determine_page_number(self, start_char: int, end_char: int) -> Optional[int]:
         """Determine page number based on character positions."""
-        if not self.page_boundaries:
-            return None
-        
-        # Find which page contains the majority of this chunk
-        chunk_midpoint = (start_char + end_char) // 2
-        
-        for page_info in self.page_boundaries:
-            if page_info['start_char'] <= chunk_midpoint <= page_info['end_char']:
-                return page_info['page_number']
-        
-        # Fallback: find the page with most overlap
-        max_overlap = 0
-        best_page = None
-        
-        for page_info in self.page_boundaries:
-            overlap_start = max(start_char, page_info['start_char'])
-            overlap_end = min(end_char, page_info['end_char'])
-            overlap = max(0, overlap_end - overlap_start)
-            
-            if overlap > max_overlap:
-                max_overlap = overlap
-                best_page = page_info['page_number']
-        
-        return best_page
+        return self._page_index.page_number(start_char, end_char)
     
     def _extract_section_title(self, text: str) -> Optional[str]:
         """Extract section title from chunk text using pattern matching."""
-        import re
-        
-        lines = text.strip().split('\n')
-        if not lines:
-            return None
+        # Only the first 3 lines are inspected, so don't split the whole chunk
+        lines = text.lstrip().split('\n', 3)[:3]
         
         # Check first few lines for section patterns
-        for i, line in enumerate(lines[:3]):  # Check first 3 lines
+        for i, line in enumerate(lines):
             line = line.strip()
             if not line:
                 continue
                 
             # Check against section patterns
-            for pattern in self.section_patterns:
-                if re.match(pattern, line, re.IGNORECASE):
-                    # Clean up the title
-                    title = re.sub(r'^\d+\.\s*', '', line)  # Remove numbering
-                    title = re.sub(r'^[IVX]+\.\s*', '', title)  # Remove roman numerals
-                    title = title.strip()
-                    
-                    if len(title) > 5:  # Ensure it's substantial
-                        return title
+            if self._section_regex.match(line):
+                # Clean up the title: remove numbering and roman numerals
+                title = self._TITLE_PREFIX_RE.sub('', line, count=1).strip()
+                
+                if len(title) > 5:  # Ensure it's substantial
+                    return title
         
         return None
     
     def _build_chunk_metadata(self, text: str, start_char: int, end_char: int) -> Dict[str, Any]:
         """Build metadata for a text chunk."""
-        import re
+        # A formula match implies a digit, so only search for numbers without one
+        has_formula = self._FORMULA_RE.search(text) is not None
         
+        # str.split runs in C and is exact: count()-based shortcuts miscount words
+        # separated by newlines and blank paragraphs, for no measurable gain
         metadata = {
             'word_count': len(text.split()),
-            'line_count': len(text.split('\n')),
-            'has_numbers': bool(re.search(r'\d+', text)),
+            'line_count': text.count('\n') + 1,
+            'has_numbers': has_formula or self._NUMBER_RE.search(text) is not None,
             'has_headings': False,
             'paragraph_count': len([p for p in text.split('\n\n') if p.strip()]),
-            'contains_formulas': bool(re.search(r'[=+\-*/]\s*\d+', text)),
-            'language_indicators': []
+            'contains_formulas': has_formula,
+            'language_indicators': detect_language_indicators(text),
+            # Identifies repeated content (headers, footers) so it is embedded once
+            'content_hash': hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
         }
         
-        # Check for heading indicators
-        lines = text.split('\n')
-        for line in lines[:5]:  # Check first few lines
+        # Check for heading indicators in the first few lines only
+        for line in text.split('\n', 5)[:5]:
             line = line.strip()
             if line.isupper() and len(line) > 5:
                 metadata['has_headings'] = True
                 break
-            if re.match(r'^\d+\.\s+[A-Z]', line):
+            if self._NUMBERED_HEADING_RE.match(line):
                 metadata['has_headings'] = True
                 break
         
-        # Detect language indicators
-        if re.search(r'\b(artículo|capítulo|sección|página)\b', text, re.IGNORECASE):
-            metadata['language_indicators'].append('spanish')
-        if re.search(r'\b(article|chapter|section|page)\b', text, re.IGNORECASE):
-            metadata['language_indicators'].append('english')
-        
         return metadata
     
     async def extract_metadata(self, file_path: str) -> Dict[str, Any]:
-        """Extract metadata from PDF file."""
-        if not pypdf:
-            return {}
+        """Extract metadata from PDF file.
         
+        Prefer ``open_and_process`` or the ``pdf_metadata`` argument of
+        ``process_pdf_stream`` when the PDF is being processed anyway.
+        """
         def _extract_metadata():
             try:
-                with open(file_path, 'rb') as file:
-                    reader = pypdf.PdfReader(file)
-                    
-                    metadata = {
-                        'page_count': len(reader.pages),
-                        'title': None,
-                        'author': None,
-                        'subject': None,
-                        'creator': None
-                    }
-                    
-                    # Extract PDF metadata if available
-                    if reader.metadata:
-                        metadata.update({
-                            'title': reader.metadata.get('/Title'),
-                            'author': reader.metadata.get('/Author'),
-                            'subject': reader.metadata.get('/Subject'),
-                            'creator': reader.metadata.get('/Creator')
-                        })
-                    
-                    return metadata
-                    
+                document = _open_pdf_document(file_path)
             except Exception as e:
                 logger.warning("Metadata extraction failed", error=str(e))
                 return {'page_count': 0}
+            try:
+                return _read_pdf_metadata(document)
+            finally:
+                document.close()
         
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _extract_metadata)
\ No newline at end of file
+        return await loop.run_in_executor(self.executor, _extract_metadata)
\ No newline at end of file
@@ -1,11 +1,96 @@
 # =======================
 # app/utils/text_chunking.py
 # =======================
-from typing import List, Dict, Any, Optional
+from bisect import bisect_left, bisect_right
+import hashlib
+from itertools import accumulate
+from typing import Iterator, List, Dict, Any, Optional
 import re
 
+# Words marking a text as Spanish or English, matched case-insensitively as whole words
+SPANISH_INDICATORS = ('artículo', 'capítulo', 'sección', 'página')
+ENGLISH_INDICATORS = ('article', 'chapter', 'section', 'page')
+
+_LANGUAGE_INDICATORS = [
+    (language, words, re.compile(r'\b(' + '|'.join(words) + r')\b', re.IGNORECASE))
+    for language, words in (('spanish', SPANISH_INDICATORS), ('english', ENGLISH_INDICATORS))
+]
+# re.IGNORECASE equates these with 'i' or 's' but str.lower() keeps them distinct
+# ('İ' lowers to 'i' followed by U+0307)
+_IGNORECASE_ONLY_CHARS = ('ı', 'ſ', '\u0307')
+
+
+def detect_language_indicators(text: str) -> List[str]:
+    """Return the languages ('spanish', 'english') whose indicator words appear in ``text``."""
+    lowered = text.lower()
+    unusual_case = any(char in lowered for char in _IGNORECASE_ONLY_CHARS)
+    
+    # Substring checks rule out most texts cheaply; the word-boundary regex
+    # only runs when an indicator could be present
+    return [
+        language for language, words, pattern in _LANGUAGE_INDICATORS
+        if (unusual_case or any(word in lowered for word in words)) and pattern.search(text)
+    ]
+
+
+class PageIndex:
+    """Page boundaries stored as parallel sorted arrays for O(log P) lookups.
+    
+    Expects pages ordered and non-overlapping, as produced by PDF extraction.
+    """
+    
+    def __init__(self, page_boundaries: Optional[List[Dict[str, Any]]] = None):
+        self.pages = []
+        self.starts = []
+        self.ends = []
+        self.numbers = []
+        for page in page_boundaries or []:
+            self.append(page)
+    
+    def append(self, page: Dict[str, Any]):
+        """Add the next page; it must start after all pages added so far."""
+        self.pages.append(page)
+        self.starts.append(page['start_char'])
+        self.ends.append(page['end_char'])
+        self.numbers.append(page['page_number'])
+    
+    def page_number(self, start_char: int, end_char: int) -> Optional[int]:
+        """Page containing the chunk midpoint, else the page overlapping it most."""
+        if not self.starts:
+            return None
+        
+        # Find which page contains the majority of this chunk
+        chunk_midpoint = (start_char + end_char) // 2
+        idx = bisect_left(self.ends, chunk_midpoint)
+        if idx < len(self.ends) and self.starts[idx] <= chunk_midpoint:
+            return self.numbers[idx]
+        
+        # Fallback: find the page with most overlap, scanning only pages
+        # that end after the chunk starts and begin before it ends
+        max_overlap = 0
+        best_page = None
+        
+        idx = bisect_right(self.ends, start_char)
+        while idx < len(self.starts) and self.starts[idx] < end_char:
+            overlap = min(end_char, self.ends[idx]) - max(start_char, self.starts[idx])
+            if overlap > max_overlap:
+                max_overlap = overlap
+                best_page = self.numbers[idx]
+            idx += 1
+        
+        return best_page
+
+
 class TextChunker:
     """Enhanced text chunking strategies with metadata tracking."""
+    
+    # Patterns used per chunk, compiled once
+    _SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+    # Leading numbering, then roman numerals, stripped from section titles
+    _TITLE_PREFIX_RE = re.compile(r'^(?:\d+\.\s*)?(?:[IVX]+\.\s*)?')
+    _NUMBER_RE = re.compile(r'\d+')
+    _FORMULA_RE = re.compile(r'[=+\-*/]\s*\d+')
+    _NUMBERED_HEADING_RE = re.compile(r'^\d+\.\s+[A-Z]')
 
     def __init__(self, 
                  chunk_size: int = 1000, 
@@ -14,7 +99,7 @@ class TextChunker:
         """Initialize TextChunker with configuration."""
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.page_boundaries = page_boundaries or []
+        self.page_boundaries = page_boundaries
         
         # Section patterns for title detection
         self.section_patterns = [
@@ -24,25 +109,35 @@ class TextChunker:
             r'^Capítulo\s+\d+',  # Chapter titles
             r'^CAPÍTULO\s+[IVX\d]+',  # Chapter titles (caps)
         ]
+        # One alternation so each line needs a single match attempt
+        self._section_regex = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.section_patterns), re.IGNORECASE
+        )
 
     def chunk_by_sentences(self, text: str, document_id: str) -> List[Dict[str, Any]]:
         """Chunk text by sentences with enhanced metadata tracking."""
+        return list(self.iter_by_sentences(text, document_id))
+
+    def iter_by_sentences(self, text: str, document_id: str) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the chunks of ``chunk_by_sentences``."""
         # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        chunks = []
-        current_chunk = ""
+        sentences = self._SENTENCE_SPLIT_RE.split(text)
+        parts = []
+        current_len = 0
         current_start = 0
         chunk_index = 0
         
         for sentence in sentences:
             sentence_with_space = sentence + " "
             
-            if len(current_chunk) + len(sentence_with_space) <= self.chunk_size:
-                current_chunk += sentence_with_space
+            piece_len = len(sentence_with_space)
+            if current_len + piece_len <= self.chunk_size:
+                parts.append(sentence_with_space)
+                current_len += piece_len
             else:
-                if current_chunk.strip():
+                chunk_text = "".join(parts).strip()
+                if chunk_text:
                     # Calculate positions
-                    chunk_text = current_chunk.strip()
                     chunk_end = current_start + len(chunk_text)
                     
                     # Create chunk with metadata
@@ -53,16 +148,17 @@ class TextChunker:
                         start_char=current_start,
                         end_char=chunk_end
                     )
-                    chunks.append(chunk_data)
+                    yield chunk_data
                     chunk_index += 1
                 
                 # Start new chunk with overlap
-                current_start = current_start + len(current_chunk) - self.chunk_overlap
-                current_chunk = sentence_with_space
+                current_start = current_start + current_len - self.chunk_overlap
+                parts = [sentence_with_space]
+                current_len = piece_len
         
         # Add final chunk
-        if current_chunk.strip():
-            chunk_text = current_chunk.strip()
+        chunk_text = "".join(parts).strip()
+        if chunk_text:
             chunk_end = current_start + len(chunk_text)
             
             chunk_data = self._create_chunk_data(
@@ -72,27 +168,31 @@ class TextChunker:
                 start_char=current_start,
                 end_char=chunk_end
             )
-            chunks.append(chunk_data)
-        
-        return chunks
+            yield chunk_data
 
     def chunk_by_paragraphs(self, text: str, document_id: str) -> List[Dict[str, Any]]:
         """Chunk text by paragraphs with enhanced metadata tracking."""
+        return list(self.iter_by_paragraphs(text, document_id))
+
+    def iter_by_paragraphs(self, text: str, document_id: str) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the chunks of ``chunk_by_paragraphs``."""
         paragraphs = text.split('\n\n')
-        chunks = []
-        current_chunk = ""
+        parts = []
+        current_len = 0
         current_start = 0
         chunk_index = 0
         
         for paragraph in paragraphs:
             paragraph_with_spacing = paragraph + "\n\n"
             
-            if len(current_chunk) + len(paragraph_with_spacing) <= self.chunk_size:
-                current_chunk += paragraph_with_spacing
+            piece_len = len(paragraph_with_spacing)
+            if current_len + piece_len <= self.chunk_size:
+                parts.append(paragraph_with_spacing)
+                current_len += piece_len
             else:
-                if current_chunk.strip():
+                chunk_text = "".join(parts).strip()
+                if chunk_text:
                     # Calculate positions
-                    chunk_text = current_chunk.strip()
                     chunk_end = current_start + len(chunk_text)
                     
                     # Create chunk with metadata
@@ -103,16 +203,17 @@ class TextChunker:
                         start_char=current_start,
                         end_char=chunk_end
                     )
-                    chunks.append(chunk_data)
+                    yield chunk_data
                     chunk_index += 1
                 
                 # Start new chunk with overlap
-                current_start = current_start + len(current_chunk) - self.chunk_overlap
-                current_chunk = paragraph_with_spacing
+                current_start = current_start + current_len - self.chunk_overlap
+                parts = [paragraph_with_spacing]
+                current_len = piece_len
         
         # Add final chunk
-        if current_chunk.strip():
-            chunk_text = current_chunk.strip()
+        chunk_text = "".join(parts).strip()
+        if chunk_text:
             chunk_end = current_start + len(chunk_text)
             
             chunk_data = self._create_chunk_data(
@@ -122,85 +223,83 @@ class TextChunker:
                 start_char=current_start,
                 end_char=chunk_end
             )
-            chunks.append(chunk_data)
-        
-        return chunks
+            yield chunk_data
 
     def chunk_by_semantic_sections(self, text: str, document_id: str) -> List[Dict[str, Any]]:
         """Chunk text by semantic sections (new method for better organization)."""
+        return list(self.iter_by_semantic_sections(text, document_id))
+
+    def iter_by_semantic_sections(self, text: str, document_id: str) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the chunks of ``chunk_by_semantic_sections``."""
         lines = text.split('\n')
-        chunks = []
-        current_chunk = ""
-        current_start = 0
+        # line_offsets[i] is where line i starts in the original text, so chunk
+        # positions come straight from line indices
+        line_offsets = list(accumulate((len(line) + 1 for line in lines), initial=0))
+        start_line = 0
         chunk_index = 0
         current_section_title = None
         
-        for line in lines:
+        for line_idx, line in enumerate(lines):
             # Check if this line is a section header
             section_title = self._extract_section_title_from_line(line)
             
-            if section_title and current_chunk.strip():
-                # Save current chunk before starting new section
-                chunk_text = current_chunk.strip()
-                chunk_end = current_start + len(chunk_text)
+            if section_title:
+                chunk_start = line_offsets[start_line]
+                chunk_end = line_offsets[line_idx]
+                chunk_text = text[chunk_start:chunk_end].strip()
                 
-                chunk_data = self._create_chunk_data(
-                    document_id=document_id,
-                    content=chunk_text,
-                    chunk_index=chunk_index,
-                    start_char=current_start,
-                    end_char=chunk_end,
-                    section_title=current_section_title
-                )
-                chunks.append(chunk_data)
-                chunk_index += 1
-                
-                # Start new chunk
-                current_start = chunk_end
-                current_chunk = ""
-                current_section_title = section_title
+                if chunk_text:
+                    # Save current chunk before starting new section
+                    chunk_data = self._create_chunk_data(
+                        document_id=document_id,
+                        content=chunk_text,
+                        chunk_index=chunk_index,
+                        start_char=chunk_start,
+                        end_char=chunk_end,
+                        section_title=current_section_title
+                    )
+                    yield chunk_data
+                    chunk_index += 1
+                    
+                    # Start new chunk
+                    start_line = line_idx
+                    current_section_title = section_title
             
-            # Add line to current chunk
-            line_with_newline = line + "\n"
-            if len(current_chunk) + len(line_with_newline) <= self.chunk_size:
-                current_chunk += line_with_newline
-            else:
+            # Add line to current chunk unless that would overflow it
+            if line_offsets[line_idx + 1] - line_offsets[start_line] > self.chunk_size:
                 # Current chunk is full, save it
-                if current_chunk.strip():
-                    chunk_text = current_chunk.strip()
-                    chunk_end = current_start + len(chunk_text)
-                    
+                chunk_start = line_offsets[start_line]
+                chunk_end = line_offsets[line_idx]
+                chunk_text = text[chunk_start:chunk_end].strip()
+                
+                if chunk_text:
                     chunk_data = self._create_chunk_data(
                         document_id=document_id,
                         content=chunk_text,
                         chunk_index=chunk_index,
-                        start_char=current_start,
+                        start_char=chunk_start,
                         end_char=chunk_end,
                         section_title=current_section_title
                     )
-                    chunks.append(chunk_data)
+                    yield chunk_data
                     chunk_index += 1
                 
-                # Start new chunk with overlap
-                current_start = current_start + len(current_chunk) - self.chunk_overlap
-                current_chunk = line_with_newline
+                # Start new chunk with this line
+                start_line = line_idx
         
         # Add final chunk
-        if current_chunk.strip():
-            chunk_text = current_chunk.strip()
-            chunk_end = current_start + len(chunk_text)
-            
+        chunk_start = line_offsets[start_line]
+        chunk_text = text[chunk_start:].strip()
+        if chunk_text:
             chunk_data = self._create_chunk_data(
                 document_id=document_id,
                 content=chunk_text,
                 chunk_index=chunk_index,
-                start_char=current_start,
-                end_char=chunk_end,
+                start_char=chunk_start,
+                end_char=len(text),
                 section_title=current_section_title
             )
-            chunks.append(chunk_data)
-        
-        return chunks
+            yield chunk_data
 
     def _create_chunk_data(self, 
                           document_id: str, 
@@ -225,41 +324,26 @@ class TextChunker:
             'chunk_metadata': self._build_chunk_metadata(content, start_char, end_char)
         }
 
+    @property
+    def page_boundaries(self) -> List[Dict[str, Any]]:
+        return self._page_boundaries
+    
+    @page_boundaries.setter
+    def page_boundaries(self, page_boundaries: Optional[List[Dict[str, Any]]]):
+        self._page_boundaries = page_boundaries or []
+        self._page_index = PageIndex(self._page_boundaries)
+    
     def _determine_page_number(self, start_char: int, end_char: int) -> Optional[int]:
         """Determine page number based on character positions."""
-        if not self.page_boundaries:
-            return None
-        
-        # Find which page contains the majority of this chunk
-        chunk_midpoint = (start_char + end_char) // 2
-        
-        for page_info in self.page_boundaries:
-            if page_info['start_char'] <= chunk_midpoint <= page_info['end_char']:
-                return page_info['page_number']
-        
-        # Fallback: find the page with most overlap
-        max_overlap = 0
-        best_page = None
-        
-        for page_info in self.page_boundaries:
-            overlap_start = max(start_char, page_info['start_char'])
-            overlap_end = min(end_char, page_info['end_char'])
-            overlap = max(0, overlap_end - overlap_start)
-            
-            if overlap > max_overlap:
-                max_overlap = overlap
-                best_page = page_info['page_number']
-        
-        return best_page
+        return self._page_index.page_number(start_char, end_char)
 
     def _extract_section_title(self, text: str) -> Optional[str]:
         """Extract section title from chunk text using pattern matching."""
-        lines = text.strip().split('\n')
-        if not lines:
-            return None
+        # Only the first 3 lines are inspected, so don't split the whole chunk
+        lines = text.lstrip().split('\n', 3)[:3]
         
         # Check first few lines for section patterns
-        for i, line in enumerate(lines[:3]):  # Check first 3 lines
+        for i, line in enumerate(lines):
             title = self._extract_section_title_from_line(line)
             if title:
                 return title
@@ -273,65 +357,68 @@ class TextChunker:
             return None
         
         # Check against section patterns
-        for pattern in self.section_patterns:
-            if re.match(pattern, line, re.IGNORECASE):
-                # Clean up the title
-                title = re.sub(r'^\d+\.\s*', '', line)  # Remove numbering
-                title = re.sub(r'^[IVX]+\.\s*', '', title)  # Remove roman numerals
-                title = title.strip()
-                
-                if len(title) > 5:  # Ensure it's substantial
-                    return title
+        if self._section_regex.match(line):
+            # Clean up the title: remove numbering and roman numerals
+            title = self._TITLE_PREFIX_RE.sub('', line, count=1).strip()
+            
+            if len(title) > 5:  # Ensure it's substantial
+                return title
         
         return None
 
     def _build_chunk_metadata(self, text: str, start_char: int, end_char: int) -> Dict[str, Any]:
         """Build metadata for a text chunk."""
+        # A formula match implies a digit, so only search for numbers without one
+        has_formula = self._FORMULA_RE.search(text) is not None
+        
+        # str.split runs in C and is exact: count()-based shortcuts miscount words
+        # separated by newlines and blank paragraphs, for no measurable gain
         metadata = {
             'word_count': len(text.split()),
-            'line_count': len(text.split('\n')),
-            'has_numbers': bool(re.search(r'\d+', text)),
+            'line_count': text.count('\n') + 1,
+            'has_numbers': has_formula or self._NUMBER_RE.search(text) is not None,
             'has_headings': False,
             'paragraph_count': len([p for p in text.split('\n\n') if p.strip()]),
-            'contains_formulas': bool(re.search(r'[=+\-*/]\s*\d+', text)),
-            'language_indicators': []
+            'contains_formulas': has_formula,
+            'language_indicators': detect_language_indicators(text),
+            # Identifies repeated content (headers, footers) so it is embedded once
+            'content_hash': hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
         }
         
-        # Check for heading indicators
-        lines = text.split('\n')
-        for line in lines[:5]:  # Check first few lines
+        # Check for heading indicators in the first few lines only
+        for line in text.split('\n', 5)[:5]:
             line = line.strip()
             if line.isupper() and len(line) > 5:
                 metadata['has_headings'] = True
                 break
-            if re.match(r'^\d+\.\s+[A-Z]', line):
+            if self._NUMBERED_HEADING_RE.match(line):
                 metadata['has_headings'] = True
                 break
         
-        # Detect language indicators
-        if re.search(r'\b(artículo|capítulo|sección|página)\b', text, re.IGNORECASE):
-            metadata['language_indicators'].append('spanish')
-        if re.search(r'\b(article|chapter|section|page)\b', text, re.IGNORECASE):
-            metadata['language_indicators'].append('english')
-        
         return metadata
 
     # Legacy methods for backward compatibility (now return simple strings)
     @staticmethod
     def chunk_by_sentences_simple(text: str, max_chunk_size: int = 1000) -> List[str]:
         """Legacy method: Chunk text by sentences, returning simple string chunks."""
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = TextChunker._SENTENCE_SPLIT_RE.split(text)
         chunks = []
-        current_chunk = ""
+        parts = []
+        current_len = 0
         for sentence in sentences:
-            if len(current_chunk) + len(sentence) <= max_chunk_size:
-                current_chunk += sentence + " "
+            piece = sentence + " "
+            if current_len + len(sentence) <= max_chunk_size:
+                parts.append(piece)
+                current_len += len(piece)
             else:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + " "
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+                chunk = "".join(parts).strip()
+                if chunk:
+                    chunks.append(chunk)
+                parts = [piece]
+                current_len = len(piece)
+        chunk = "".join(parts).strip()
+        if chunk:
+            chunks.append(chunk)
         return chunks
 
     @staticmethod
@@ -339,14 +426,20 @@ class TextChunker:
         """Legacy method: Chunk text by paragraphs, returning simple string chunks."""
         paragraphs = text.split('\n\n')
         chunks = []
-        current_chunk = ""
+        parts = []
+        current_len = 0
         for paragraph in paragraphs:
-            if len(current_chunk) + len(paragraph) <= max_chunk_size:
-                current_chunk += paragraph + "\n\n"
+            piece = paragraph + "\n\n"
+            if current_len + len(paragraph) <= max_chunk_size:
+                parts.append(piece)
+                current_len += len(piece)
             else:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph + "\n\n"
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+                chunk = "".join(parts).strip()
+                if chunk:
+                    chunks.append(chunk)
+                parts = [piece]
+                current_len = len(piece)
+        chunk = "".join(parts).strip()
+        if chunk:
+            chunks.append(chunk)
         return chunks
@@ -0,0 +1,104 @@
+# =======================
+# app/utils/vector_operations.py
+# =======================
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_vector(vector: Sequence[float]) -> np.ndarray:
+    """Return a float32 unit-length copy of a vector (zero vectors are left as-is)."""
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    if norm > 0:
+        array = array / norm
+    return array
+
+
+def normalize_embeddings(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """Stack embeddings into a float32 matrix of unit-length rows."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def to_pgvector(vector: np.ndarray) -> str:
+    """Format a float32 vector as a pgvector text literal.
+    
+    float32 values print with their shortest round-trip representation, which
+    keeps the payload much smaller than the equivalent JSON list of doubles.
+    """
+    return '[' + ','.join(map(str, vector)) + ']'
+
+
+class _RingBuffer:
+    """Fixed-size ring of (unit vector -> value) pairs."""
+    
+    def __init__(self, capacity: int, dimension: int):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.values: List[Any] = [None] * capacity
+        self.size = 0
+        self.next_slot = 0
+    
+    def lookup(self, query: np.ndarray, threshold: float) -> Optional[Any]:
+        if self.size == 0:
+            return None
+        similarities = self.vectors[:self.size] @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] >= threshold:
+            return self.values[best]
+        return None
+    
+    def insert(self, query: np.ndarray, value: Any) -> None:
+        self.vectors[self.next_slot] = query
+        self.values[self.next_slot] = value
+        self.next_slot = (self.next_slot + 1) % len(self.values)
+        self.size = min(self.size + 1, len(self.values))
+
+
+class SemanticCache:
+    """In-memory semantic cache mapping query embeddings to results.
+    
+    A lookup hits when a previously stored embedding under the same key has
+    cosine similarity >= ``threshold`` with the query embedding. Each key gets
+    its own ring buffer of ``capacity`` entries, so the oldest entry is
+    overwritten once the buffer is full. At most ``max_keys`` buffers are
+    kept; the least recently used key is dropped to make room for a new one.
+    """
+    
+    def __init__(self, capacity: int = 512, threshold: float = 0.97, max_keys: int = 16):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.max_keys = max_keys
+        self._buffers: 'OrderedDict[Hashable, _RingBuffer]' = OrderedDict()
+    
+    def get(self, key: Hashable, embedding: Sequence[float]) -> Optional[Any]:
+        """Return the cached value for a semantically similar query, if any."""
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            return None
+        self._buffers.move_to_end(key)
+        query = normalize_vector(embedding)
+        if query.shape[0] != buffer.vectors.shape[1]:
+            return None
+        return buffer.lookup(query, self.threshold)
+    
+    def put(self, key: Hashable, embedding: Sequence[float], value: Any) -> None:
+        """Store a value for the given query embedding."""
+        query = normalize_vector(embedding)
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.vectors.shape[1] != query.shape[0]:
+            buffer = _RingBuffer(self.capacity, query.shape[0])
+            self._buffers[key] = buffer
+        self._buffers.move_to_end(key)
+        while len(self._buffers) > self.max_keys:
+            self._buffers.popitem(last=False)
+        buffer.insert(query, value)
+    
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._buffers.clear()
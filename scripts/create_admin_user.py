@@ -6,43 +6,51 @@ Script to create an admin user.
 """
 import asyncio
 import sys
+from typing import List
 
-from app.core.config import get_settings
-from app.services.user_service import UserService
-from app.repositories.user_repository import UserRepository
-from app.providers.database.supabase_provider import SupabaseProvider
+from app.core.container import get_container
 from app.models.user import UserCreateRequest, UserType
 
+# Fixed fields shared by every admin created by this script
+_ADMIN_DEFAULTS = {
+    'user_type': UserType.ADMIN,
+    'preferences': {"role": "administrator"}
+}
+
+async def create_admin_users(emails: List[str]):
+    """Create several admin users concurrently over the shared provider."""
+    # Drop repeated emails so concurrent creates can't race on the same user
+    await asyncio.gather(*(create_admin_user(email) for email in dict.fromkeys(emails)))
+
 async def create_admin_user(email: str):
     """Create an admin user."""
-    print(f"👤 Creating admin user: {email}")
+    # Report each user as one block so concurrent creates don't interleave
+    lines = [f"👤 Creating admin user: {email}"]
     
-    settings = get_settings()
-    db_provider = SupabaseProvider(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-    user_repo = UserRepository(db_provider)
-    user_service = UserService(user_repo)
+    # The container builds the Supabase provider once and reuses it
+    user_service = get_container().get_user_service()
     
     try:
-        request = UserCreateRequest(
-            email=email,
-            user_type=UserType.ADMIN,
-            preferences={"role": "administrator"}
-        )
+        # Emails come from the command line, so keep full validation
+        request = UserCreateRequest(email=email, **_ADMIN_DEFAULTS)
         
         user = await user_service.create_user(request)
-        print(f"✅ Admin user created successfully!")
-        print(f"   ID: {user.id}")
-        print(f"   Email: {user.email}")
-        print(f"   Type: {user.user_type}")
+        lines.extend([
+            "✅ Admin user created successfully!",
+            f"   ID: {user.id}",
+            f"   Email: {user.email}",
+            f"   Type: {user.user_type}"
+        ])
         
     except Exception as e:
-        print(f"❌ Failed to create admin user: {e}")
+        lines.append(f"❌ Failed to create admin user: {e}")
+    
+    print("\n".join(lines))
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python scripts/create_admin_user.py <email>")
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/create_admin_user.py <email> [<email> ...]")
         sys.exit(1)
     
-    email = sys.argv[1]
-    asyncio.run(create_admin_user(email))
+    asyncio.run(create_admin_users(sys.argv[1:]))
 
@@ -8,10 +8,31 @@ Run this after creating your Supabase project.
 import asyncio
 import os
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from app.core.config import get_settings
 from app.providers.database.supabase_provider import SupabaseProvider
 
+# Sample document records seeded for the admin user
+SAMPLE_DOCUMENTS = [
+    {
+        'filename': 'reglamento_academico_2024.pdf',
+        'original_filename': 'Reglamento Académico 2024.pdf',
+        'document_type': 'academic_regulations',
+        'storage_bucket': 'official-documents',
+        'storage_path': 'documents/academic_regulations/reglamento_academico_2024.pdf',
+        'processing_status': 'pending'
+    },
+    {
+        'filename': 'procedimientos_matricula.pdf',
+        'original_filename': 'Procedimientos de Matrícula.pdf',
+        'document_type': 'procedures',
+        'storage_bucket': 'official-documents',
+        'storage_path': 'documents/procedures/procedimientos_matricula.pdf',
+        'processing_status': 'pending'
+    }
+]
+
 async def setup_database():
     """Set up database with initial data."""
     print("🚀 Setting up University Chatbot database...")
@@ -37,44 +58,25 @@ async def setup_database():
             'is_active': True
         }
         
+        admin_user: Optional[Dict[str, Any]] = None
         try:
-            admin_user = await db.create('users', admin_data)
-            print(f"✅ Admin user created with ID: {admin_user['id']}")
+            # Upsert on email so re-running the setup reuses the existing admin
+            admin_user = await db.upsert('users', admin_data, on_conflict='email')
+            print(f"✅ Admin user ready with ID: {admin_user['id']}")
         except Exception as e:
-            if "duplicate key" in str(e).lower():
-                print("ℹ️ Admin user already exists")
-            else:
-                print(f"⚠️ Failed to create admin user: {e}")
+            print(f"⚠️ Failed to create admin user: {e}")
         
         # Create sample documents
         print("📄 Creating sample document records...")
-        sample_docs = [
-            {
-                'filename': 'reglamento_academico_2024.pdf',
-                'original_filename': 'Reglamento Académico 2024.pdf',
-                'document_type': 'academic_regulations',
-                'storage_bucket': 'official-documents',
-                'storage_path': 'documents/academic_regulations/reglamento_academico_2024.pdf',
-                'processing_status': 'pending',
-                'uploaded_by': admin_user['id'] if 'admin_user' in locals() else None
-            },
-            {
-                'filename': 'procedimientos_matricula.pdf',
-                'original_filename': 'Procedimientos de Matrícula.pdf',
-                'document_type': 'procedures',
-                'storage_bucket': 'official-documents',
-                'storage_path': 'documents/procedures/procedimientos_matricula.pdf',
-                'processing_status': 'pending',
-                'uploaded_by': admin_user['id'] if 'admin_user' in locals() else None
-            }
-        ]
+        uploaded_by = admin_user['id'] if admin_user else None
+        sample_docs = [{**doc, 'uploaded_by': uploaded_by} for doc in SAMPLE_DOCUMENTS]
         
-        for doc_data in sample_docs:
-            try:
-                doc = await db.create('documents', doc_data)
-                print(f"✅ Sample document created: {doc['filename']}")
-            except Exception as e:
-                print(f"⚠️ Failed to create document {doc_data['filename']}: {e}")
+        # Insert sample documents in bulk rather than one request per row
+        try:
+            docs = await db.create_many('documents', sample_docs)
+            print(f"✅ Created {len(docs)} sample documents")
+        except Exception as e:
+            print(f"⚠️ Failed to create sample documents: {e}")
         
         print("🎉 Database setup completed successfully!")
         print("\n📋 Next steps:")
@@ -5,59 +5,85 @@
 Script to test the API endpoints.
 """
 import asyncio
+from typing import List, Tuple
+
 import httpx
 
+BASE_URL = "http://localhost:8000"
+
+# Keep-alive pool shared by the concurrent probes; chat replies wait on the
+# LLM, so reads get more time than connects
+CLIENT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+CLIENT_TIMEOUT = httpx.Timeout(30.0, connect=2.0)
+
+# Each probe returns (name, ok, detail lines)
+ProbeResult = Tuple[str, bool, List[str]]
+
+
+async def probe_health(client: httpx.AsyncClient) -> ProbeResult:
+    """Test health endpoint."""
+    name = "Health check"
+    try:
+        response = await client.get(f"{BASE_URL}/health")
+        if response.status_code == 200:
+            return name, True, [f"Response: {response.json()}"]
+        return name, False, [f"Status: {response.status_code}"]
+    except Exception as e:
+        return name, False, [f"Error: {e}"]
+
+
+async def probe_chat(client: httpx.AsyncClient) -> ProbeResult:
+    """Test chat endpoint."""
+    name = "Chat endpoint"
+    try:
+        chat_request = {
+            "message": "Hello, I need help with enrollment procedures",
+            "user_id": "test-user-123"
+        }
+        
+        response = await client.post(f"{BASE_URL}/api/v1/chat/", json=chat_request)
+        if response.status_code == 200:
+            chat_response = response.json()
+            return name, True, [f"Response: {chat_response['message']['content'][:100]}..."]
+        return name, False, [f"Status: {response.status_code}", f"Error: {response.text}"]
+    except Exception as e:
+        return name, False, [f"Error: {e}"]
+
+
+async def probe_complaints(client: httpx.AsyncClient) -> ProbeResult:
+    """Test complaints endpoint."""
+    name = "Complaints endpoint"
+    try:
+        response = await client.get(f"{BASE_URL}/api/v1/complaints/")
+        if response.status_code == 200:
+            complaints = response.json()
+            return name, True, [f"Found {len(complaints['complaints'])} complaints"]
+        return name, False, [f"Status: {response.status_code}"]
+    except Exception as e:
+        return name, False, [f"Error: {e}"]
+
+
 async def test_api():
     """Test basic API functionality."""
-    base_url = "http://localhost:8000"
+    probes = (probe_health, probe_chat, probe_complaints)
     
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT) as client:
         print("🧪 Testing University Chatbot API...")
         
-        # Test health endpoint
-        print("\n1. Testing health endpoint...")
-        try:
-            response = await client.get(f"{base_url}/health")
-            if response.status_code == 200:
-                print("✅ Health check passed")
-                print(f"   Response: {response.json()}")
-            else:
-                print(f"❌ Health check failed: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Health check error: {e}")
-        
-        # Test chat endpoint
-        print("\n2. Testing chat endpoint...")
-        try:
-            chat_request = {
-                "message": "Hello, I need help with enrollment procedures",
-                "user_id": "test-user-123"
-            }
-            
-            response = await client.post(f"{base_url}/api/v1/chat/", json=chat_request)
-            if response.status_code == 200:
-                print("✅ Chat endpoint working")
-                chat_response = response.json()
-                print(f"   Response: {chat_response['message']['content'][:100]}...")
-            else:
-                print(f"❌ Chat endpoint failed: {response.status_code}")
-                print(f"   Error: {response.text}")
-        except Exception as e:
-            print(f"❌ Chat endpoint error: {e}")
-        
-        # Test complaints endpoint
-        print("\n3. Testing complaints endpoint...")
-        try:
-            response = await client.get(f"{base_url}/api/v1/complaints/")
-            if response.status_code == 200:
-                print("✅ Complaints endpoint working")
-                complaints = response.json()
-                print(f"   Found {len(complaints['complaints'])} complaints")
-            else:
-                print(f"❌ Complaints endpoint failed: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Complaints endpoint error: {e}")
+        # Probes are independent, so run them concurrently on one client
+        results = await asyncio.gather(
+            *(probe(client) for probe in probes), return_exceptions=True
+        )
+    
+    # Build the report and write it in one go
+    lines = []
+    for i, (probe, result) in enumerate(zip(probes, results), 1):
+        if isinstance(result, BaseException):
+            result = (probe.__name__, False, [f"Error: {result}"])
+        name, ok, details = result
+        lines.append(f"\n{i}. {'✅' if ok else '❌'} {name} {'passed' if ok else 'failed'}")
+        lines.extend(f"   {line}" for line in details)
+    print("\n".join(lines))
 
 if __name__ == "__main__":
     asyncio.run(test_api())
-
@@ -0,0 +1,124 @@
+# =======================
+# tests/unit/test_utils/test_document_processing.py
+# =======================
+import asyncio
+import random
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.utils.document_processing import (
+    DocumentProcessor,
+    _DefaultChunkBuilder,
+    _as_async_iter,
+    _iter_text_segments,
+)
+from app.utils.text_chunking import PageIndex
+
+
+def _reference_page_number(pages: List[Dict[str, Any]], start_char: int, end_char: int) -> Optional[int]:
+    """Linear page lookup the default chunker originally used."""
+    if not pages:
+        return None
+    
+    chunk_midpoint = (start_char + end_char) // 2
+    for page_info in pages:
+        if page_info['start_char'] <= chunk_midpoint <= page_info['end_char']:
+            return page_info['page_number']
+    
+    max_overlap = 0
+    best_page = None
+    for page_info in pages:
+        overlap = max(0, min(end_char, page_info['end_char']) - max(start_char, page_info['start_char']))
+        if overlap > max_overlap:
+            max_overlap = overlap
+            best_page = page_info['page_number']
+    return best_page
+
+
+def _reference_chunks(processor: DocumentProcessor,
+                      text: str,
+                      pages: List[Dict[str, Any]],
+                      document_id: str) -> List[Dict[str, Any]]:
+    """One-shot default chunking of the full text with str.rfind boundaries."""
+    chunk_size = processor.chunk_size
+    chunks = []
+    start = 0
+    chunk_index = 0
+    
+    while start < len(text):
+        end = start + chunk_size
+        
+        if end < len(text):
+            paragraph_break = text.rfind('\n\n', start, end)
+            if paragraph_break > start + (chunk_size * 0.3):
+                end = paragraph_break
+            else:
+                sentence_break = text.rfind('.', start, end)
+                if sentence_break > start + (chunk_size * 0.5):
+                    end = sentence_break + 1
+        
+        chunk_text = text[start:end].strip()
+        if chunk_text and len(chunk_text) > 50:
+            chunks.append({
+                'document_id': document_id,
+                'content': chunk_text,
+                'chunk_index': chunk_index,
+                'page_number': _reference_page_number(pages, start, end),
+                'section_title': processor._extract_section_title(chunk_text),
+                'start_char': start,
+                'end_char': end,
+                'character_count': len(chunk_text),
+                'chunk_metadata': processor._build_chunk_metadata(chunk_text, start, end)
+            })
+            chunk_index += 1
+        
+        start = max(end - processor.chunk_overlap, start + 1)
+    
+    return chunks
+
+
+def _random_page(rng: random.Random) -> str:
+    """Page text with sentence and paragraph breaks in random places."""
+    pieces = []
+    for _ in range(rng.randint(0, 60)):
+        pieces.append(rng.choice([
+            "palabra", "Artículo", "1.", "estudiante", "matrícula", "\ud835",
+            ".", ". ", "\n", "\n\n", " ", "  ", "CAPÍTULO I", "x" * rng.randint(1, 40)
+        ]))
+        pieces.append(rng.choice([" ", " ", "\n"]))
+    # Extracted pages often end in a newline, so "\n\n" can straddle the page join
+    return "".join(pieces) + rng.choice(["", ".", "\n"])
+
+
+async def _collect_segments(page_texts: List[str], page_index: PageIndex) -> List[str]:
+    pages = _as_async_iter(enumerate(page_texts))
+    return [segment async for segment in _iter_text_segments(pages, page_index)]
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(120, 30), (300, 100), (1000, 200)])
+@pytest.mark.parametrize("seed", range(25))
+def test_streaming_builder_matches_one_shot_chunking(seed, chunk_size, chunk_overlap):
+    rng = random.Random(seed)
+    # Short, empty and whitespace-only pages put chunk boundaries across page seams
+    page_texts = [
+        rng.choice([_random_page(rng), _random_page(rng), "", "  \n"])
+        for _ in range(rng.randint(1, 12))
+    ]
+    processor = DocumentProcessor(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, extraction_workers=1
+    )
+    try:
+        page_index = PageIndex()
+        segments = asyncio.run(_collect_segments(page_texts, page_index))
+        
+        builder = _DefaultChunkBuilder(processor, "doc", page_index)
+        streamed = []
+        for segment in segments:
+            streamed.extend(builder.feed(segment))
+        streamed.extend(builder.finish())
+        
+        expected = _reference_chunks(processor, "".join(segments), page_index.pages, "doc")
+        assert streamed == expected
+    finally:
+        processor.close()